@@ -1,14 +1,34 @@
 # Импорт необходимых модулей для работы с админкой и моделями
 from django.contrib import admin
 from blog.models import Post, Category, Location
+from blog.search import filter_posts
+from blog.tasks import schedule_image_processing
+
+
+# Загруженные через админку изображения обрабатываются фоновой задачей
+class ImageProcessingMixin:
+    def save_model(self, request, obj, form, change):
+        image_changed = 'image' in form.changed_data and obj.image
+        if image_changed and hasattr(obj, 'image_ready'):
+            obj.image_ready = False
+        super().save_model(request, obj, form, change)
+        if image_changed:
+            schedule_image_processing(obj)
 
 # Настройка административной панели для модели Post
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ImageProcessingMixin, admin.ModelAdmin):
     # Определение полей, по которым можно будет искать записи в админке
-    search_fields = ('title', 'text', 'pub_date')
+    search_fields = ('title', 'text')
+
+    # Поиск по тексту идёт через полнотекстовый индекс вместо icontains;
+    # в админке нужны все совпадения, а не лучшие SEARCH_MAX_RESULTS
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_posts(queryset, search_term), False
 
 # Настройка административной панели для модели Category
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ImageProcessingMixin, admin.ModelAdmin):
     # Определение полей для поиска
     search_fields = ('title', 'description')
 
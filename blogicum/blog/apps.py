@@ -5,3 +5,8 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        # Подключение обработчиков сигналов для сброса кэшей
+        # и регистрация фоновых задач
+        from blog import signals, tasks  # noqa: F401
@@ -0,0 +1,173 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import render
+from django.views import View
+
+from blog import comment_buffer
+from blog.conditional import conditional_post_page
+from blog.forms import CommentForm
+from blog.lookups import get_published_category
+from blog.models import Comment, Post
+from blog.page_cache import cache_public_page
+from blog.paginators import CursorPaginator
+from blog.views import (
+    LIMIT_COMMENTS,
+    get_feed_page,
+    get_page_obj,
+    get_profile_feed,
+)
+from core.db_router import read_from_replica
+
+# Асинхронные версии публичных страниц для запуска под ASGI
+# (включаются настройкой BLOG_ASYNC_VIEWS). Независимые запросы к БД
+# одного представления выполняются параллельно в отдельных потоках
+
+User = get_user_model()
+
+
+def in_thread(func):
+    # Каждый вызов идёт в потоке из пула со своим соединением к БД;
+    # после вызова соединение закрывается по правилам CONN_MAX_AGE,
+    # как в конце обычного запроса
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def load_page(request, posts):
+    page_obj = get_page_obj(request, posts)
+    # Страница загружается здесь, а не при отрисовке шаблона
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+def first_or_none(queryset):
+    return queryset.first()
+
+
+async def get_username(request):
+    # Сессия и пользователь загружаются до запуска параллельных запросов
+    return await sync_to_async(lambda: request.user.username)()
+
+
+async def render_async(request, template, context):
+    return await sync_to_async(render)(request, template, context)
+
+
+@cache_public_page
+@read_from_replica
+async def index(request):
+    await get_username(request)
+    page_obj = await in_thread(load_page)(
+        request, Post.objects.published().for_feed()
+    )
+    return await render_async(
+        request, "blog/index.html", {"page_obj": page_obj}
+    )
+
+
+@cache_public_page
+@read_from_replica
+async def category_posts(request, category_slug):
+    await get_username(request)
+    # Категория берётся из справочника в памяти процесса; база
+    # нужна, только если справочник устарел
+    category = await in_thread(get_published_category)(category_slug)
+    if category is None:
+        raise Http404()
+    page_obj = await in_thread(get_feed_page)(
+        request, category.feed_entries.all()
+    )
+    return await render_async(
+        request,
+        "blog/category.html",
+        {"category": category, "page_obj": page_obj},
+    )
+
+
+@read_from_replica
+async def profile_view(request, username):
+    users = User.objects.filter(username=username)
+    if await get_username(request) == username:
+        user, page_obj = await asyncio.gather(
+            in_thread(first_or_none)(users),
+            in_thread(load_page)(
+                request,
+                Post.objects.for_feed().filter(author__username=username),
+            ),
+        )
+        context = {"page_obj": page_obj}
+    else:
+        # Ключ кэша ленты строится по id автора, поэтому сначала
+        # загружается пользователь
+        user = await in_thread(first_or_none)(users)
+        context = {}
+        if user is not None:
+            context["profile_feed"] = await in_thread(get_profile_feed)(
+                request, user
+            )
+    if user is None:
+        raise Http404()
+    context["profile"] = user
+    return await render_async(request, "blog/profile.html", context)
+
+
+class PostDetailView(View):
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Django 3.2 не распознаёт асинхронные классы-представления,
+        # поэтому view оборачивается в сопрограмму явно
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return read_from_replica(
+            conditional_post_page(wraps(view)(async_view))
+        )
+
+    def get_post(self, post_id):
+        return first_or_none(
+            Post.objects.with_related()
+            .visible_to(self.request.user)
+            .filter(pk=post_id)
+        )
+
+    def get_comments(self, post_id):
+        paginator = CursorPaginator(
+            Comment.objects.filter(post_id=post_id).select_related("author"),
+            LIMIT_COMMENTS,
+            ordering=("created_at", "id"),
+        )
+        return paginator.get_page(self.request.GET.get("comments"))
+
+    async def get(self, request, post_id):
+        await get_username(request)
+        # Пост и первая порция комментариев запрашиваются одновременно;
+        # для скрытого поста комментарии просто отбрасываются
+        post, comments = await asyncio.gather(
+            in_thread(self.get_post)(post_id),
+            in_thread(self.get_comments)(post_id),
+        )
+        if post is None:
+            raise Http404()
+        context = {
+            "post": post,
+            "object": post,
+            "form": CommentForm(),
+            "comments": comments,
+        }
+        if request.user.is_authenticated:
+            context["pending_comments"] = await sync_to_async(
+                comment_buffer.get_pending
+            )(request, post.pk)
+        return await render_async(request, "blog/detail.html", context)
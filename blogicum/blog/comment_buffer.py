@@ -0,0 +1,407 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: журнал на диске недоступен
+    fcntl = None
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog import fragments, profile_cache
+from blog.models import Comment, Post
+from core import ratelimit
+from core.sqlite import retry_on_lock
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def pending_key(user_id):
+    # Ещё не записанные комментарии пользователя: их автор видит сразу,
+    # пока поток записи не добавил их в базу. Они хранятся в общем кэше,
+    # а не в сессии, чтобы приём комментария не писал в таблицу сессий
+    return f'comment_pending:{user_id}'
+
+
+@retry_on_lock
+def write_batch(entries):
+    # Пачка комментариев и счётчики постов и авторов — одна транзакция,
+    # то есть одна блокировка записи SQLite на всю пачку
+    with transaction.atomic():
+        # Пост или автор могли быть удалены, пока комментарий ждал записи
+        post_ids = set(
+            Post.objects.filter(
+                pk__in={entry['post_id'] for entry in entries}
+            ).values_list('pk', flat=True)
+        )
+        author_ids = set(
+            User.objects.filter(
+                pk__in={entry['author_id'] for entry in entries}
+            ).values_list('pk', flat=True)
+        )
+        comments = Comment.objects.bulk_create([
+            Comment(
+                post_id=entry['post_id'],
+                author_id=entry['author_id'],
+                text=entry['text'],
+                created_at=parse_datetime(entry['created_at']),
+            )
+            for entry in entries
+            if entry['post_id'] in post_ids
+            and entry['author_id'] in author_ids
+        ])
+        # bulk_create не отправляет сигналы: счётчики обновляются здесь,
+        # по одному UPDATE на пост и на автора
+        per_post = defaultdict(list)
+        for comment in comments:
+            per_post[comment.post_id].append(comment.created_at)
+        for post_id, dates in per_post.items():
+            Post.objects.filter(pk=post_id).comment_added(
+                max(dates), count=len(dates)
+            )
+        per_author = Counter(comment.author_id for comment in comments)
+        for author_id, count in per_author.items():
+            User.objects.filter(pk=author_id).comment_added(count)
+
+        # Карточки постов и ленты их авторов показывают число
+        # комментариев; сброс выполняется после коммита
+        for post_id in per_post:
+            fragments.invalidate_post(post_id)
+        profile_cache.invalidate_profiles(
+            Post.objects.filter(pk__in=per_post)
+            .values_list('author_id', flat=True)
+        )
+    return len(comments)
+
+
+class CommentSpool:
+    # Журнал принятых, но ещё не записанных комментариев процесса: файл
+    # в COMMENT_SPOOL_DIR, по строке JSON на комментарий. Пока процесс
+    # жив, он держит на файле блокировку flock; блокировка снимается и при
+    # аварийном завершении, поэтому журнал без блокировки принадлежит
+    # завершившемуся процессу и дописывается в базу другим
+    def __init__(self):
+        self._file = None
+
+    @property
+    def enabled(self):
+        return fcntl is not None and settings.COMMENT_SPOOL_DIR is not None
+
+    def open(self):
+        directory = Path(settings.COMMENT_SPOOL_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}-{time.time_ns()}.jsonl'
+        self._file = open(path, 'a', encoding='utf-8')
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def append(self, entry):
+        if not self.enabled:
+            return
+        if self._file is None:
+            self.open()
+        # Запись доходит до ядра сразу: после SIGKILL она сохранится
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def replace(self, entries):
+        # Журнал приводится к комментариям, которые ещё ждут записи
+        if self._file is None:
+            return
+        self._file.truncate(0)
+        for entry in entries:
+            self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def close(self):
+        # Пустой журнал при штатном завершении удаляется
+        if self._file is None:
+            return
+        if not os.fstat(self._file.fileno()).st_size:
+            os.unlink(self._file.name)
+        self._file.close()
+        self._file = None
+
+    def forget(self):
+        # После fork журнал и его блокировка остаются родителю
+        self._file = None
+
+    def dead_letter(self, entries):
+        # Комментарии, которые так и не удалось записать, сохраняются
+        # в файл .failed: восстановление его не читает, он разбирается
+        # вручную. Без журнала на диске они остаются только в логе
+        if not self.enabled:
+            logger.error(
+                'Комментарии не записаны: %s',
+                json.dumps(entries, ensure_ascii=False),
+            )
+            return
+        directory = Path(settings.COMMENT_SPOOL_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}-{time.time_ns()}.failed'
+        with open(path, 'w', encoding='utf-8') as file:
+            for entry in entries:
+                file.write(json.dumps(entry) + '\n')
+        logger.error(
+            'Не удалось записать %s комментариев, они сохранены в %s',
+            len(entries), path,
+        )
+
+    def orphans(self):
+        # Журналы завершившихся процессов: (путь, записи)
+        if not self.enabled:
+            return
+        own = self._file.name if self._file is not None else None
+        for path in sorted(Path(settings.COMMENT_SPOOL_DIR).glob('*.jsonl')):
+            if str(path) == own:
+                continue
+            try:
+                file = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with file:
+                if self.is_orphan(file):
+                    yield path, self.read(file)
+
+    @staticmethod
+    def is_orphan(file):
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        # Файл мог удалить другой процесс, пока этот ждал открытия
+        return os.fstat(file.fileno()).st_nlink > 0
+
+    @staticmethod
+    def read(file):
+        entries = []
+        for line in file:
+            # Последняя строка обрывается, если процесс убили во время
+            # записи
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                pass
+        return entries
+
+
+class CommentBuffer:
+    # Очередь комментариев в памяти процесса и поток, который пишет их
+    # в базу пачками: раз в COMMENT_FLUSH_INTERVAL секунд или сразу,
+    # как наберётся COMMENT_BATCH_SIZE комментариев. Каждый принятый
+    # комментарий дописывается в журнал на диске (CommentSpool), поэтому
+    # ни ошибка записи, ни падение процесса его не теряют
+    def __init__(self):
+        self._entries = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+        self.spool = CommentSpool()
+
+    def add(self, entry):
+        with self._condition:
+            if self._pid != os.getpid():
+                # Процесс порождён fork от процесса с очередью: её
+                # комментарии запишет родитель
+                self._pid = os.getpid()
+                self._entries = []
+                self.spool.forget()
+            self.spool.append(entry)
+            self._entries.append(entry)
+            self._ensure_thread()
+            if len(self._entries) >= settings.COMMENT_BATCH_SIZE:
+                self._condition.notify()
+
+    def _ensure_thread(self):
+        # Поток создаётся при первом комментарии, в том числе заново
+        # в процессе, порождённом fork от процесса с очередью
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self._thread is None:
+            atexit.register(self.shutdown)
+        self._thread = threading.Thread(
+            target=self._run, name='comment-buffer', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        self.recover()
+        while True:
+            with self._condition:
+                self._condition.wait(settings.COMMENT_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        # Записывает всё накопленное; вызывается потоком очереди, при
+        # завершении процесса и командами, которым нужны данные в базе.
+        # При ошибке комментарии возвращаются в начало очереди и будут
+        # записаны следующей попыткой
+        with self._flush_lock:
+            with self._condition:
+                entries, self._entries = self._entries, []
+            if not entries:
+                return 0
+            try:
+                written = write_batch(entries)
+                entries = []
+            except Exception:
+                logger.exception(
+                    'Не удалось записать %s комментариев, повтор позже',
+                    len(entries),
+                )
+                written = 0
+                entries = self.count_attempt(entries)
+            finally:
+                close_old_connections()
+            with self._condition:
+                self._entries[:0] = entries
+                self.spool.replace(self._entries)
+            return written
+
+    def count_attempt(self, entries):
+        # Комментарии, не записанные COMMENT_MAX_ATTEMPTS раз подряд,
+        # уходят из очереди, чтобы не задерживать следующие
+        for entry in entries:
+            entry['attempts'] = entry.get('attempts', 0) + 1
+        failed = [
+            entry for entry in entries
+            if entry['attempts'] >= settings.COMMENT_MAX_ATTEMPTS
+        ]
+        if failed:
+            self.spool.dead_letter(failed)
+        return [
+            entry for entry in entries
+            if entry['attempts'] < settings.COMMENT_MAX_ATTEMPTS
+        ]
+
+    def recover(self):
+        # Комментарии из журналов процессов, завершившихся до их записи
+        for path, entries in self.spool.orphans():
+            try:
+                if entries:
+                    write_batch(entries)
+            except Exception:
+                logger.exception('Не удалось записать журнал %s', path)
+                continue
+            finally:
+                close_old_connections()
+            os.unlink(path)
+            logger.info(
+                'Записано %s комментариев из журнала %s', len(entries), path
+            )
+
+    def shutdown(self):
+        self.flush()
+        with self._condition:
+            if not self._entries:
+                self.spool.close()
+
+
+buffer = CommentBuffer()
+
+
+def dedup_key(user, post_id, text):
+    digest = hashlib.md5(text.encode()).hexdigest()
+    return f'comment_dedup:{user.pk}:{post_id}:{digest}'
+
+
+def submit(request, post_id, text):
+    # Приём комментария без записи в базу в рамках запроса. Бросает
+    # ratelimit.RateLimited, если пользователь исчерпал лимит
+    key = dedup_key(request.user, post_id, text)
+    # Повторная отправка той же формы (двойной клик, обновление страницы
+    # после POST) в течение COMMENT_DEDUP_SECONDS молча отбрасывается.
+    # cache.add в memcached атомарен: из двух одновременных запросов
+    # проходит один; файловый кэш изредка пропускает оба
+    if not cache.add(key, True, settings.COMMENT_DEDUP_SECONDS):
+        return
+    try:
+        ratelimit.consume(
+            f'comment:{request.user.pk}',
+            settings.COMMENT_RATE,
+            settings.COMMENT_BURST,
+        )
+    except ratelimit.RateLimited:
+        # Отклонённый комментарий можно будет отправить снова
+        cache.delete(key)
+        raise
+    entry = {
+        'post_id': post_id,
+        'author_id': request.user.pk,
+        'text': text,
+        'created_at': timezone.now().isoformat(),
+    }
+    if not settings.COMMENT_BUFFERING:
+        write_batch([entry])
+        return
+    buffer.add(entry)
+    key = pending_key(request.user.pk)
+    cache.set(
+        key,
+        cache.get(key, []) + [entry],
+        settings.COMMENT_PENDING_SECONDS,
+    )
+
+
+def has_pending(request, post_id):
+    return any(
+        entry['post_id'] == post_id
+        for entry in cache.get(pending_key(request.user.pk), ())
+    )
+
+
+def get_pending(request, post_id):
+    # Комментарии автора к посту, которых ещё нет в базе. Найденные
+    # в базе и слишком старые записи убираются из списка
+    key = pending_key(request.user.pk)
+    pending = cache.get(key)
+    if not pending:
+        return []
+    now = timezone.now()
+    fresh = [
+        entry for entry in pending
+        if (now - parse_datetime(entry['created_at'])).total_seconds()
+        < settings.COMMENT_PENDING_SECONDS
+    ]
+    waiting = [entry for entry in fresh if entry['post_id'] == post_id]
+    if waiting:
+        # При записи комментарий получает время приёма; записи идут
+        # в списке по порядку приёма
+        saved = Counter(
+            Comment.objects.filter(
+                post_id=post_id,
+                author=request.user,
+                created_at__gte=parse_datetime(waiting[0]['created_at']),
+            ).values_list('text', flat=True)
+        )
+        written = set()
+        for entry in waiting:
+            if saved[entry['text']]:
+                saved[entry['text']] -= 1
+                written.add(id(entry))
+        waiting = [entry for entry in waiting if id(entry) not in written]
+        fresh = [entry for entry in fresh if id(entry) not in written]
+    if len(fresh) != len(pending):
+        cache.set(key, fresh, settings.COMMENT_PENDING_SECONDS)
+    return [
+        {
+            'author': request.user,
+            'text': entry['text'],
+            'created_at': parse_datetime(entry['created_at']),
+        }
+        for entry in waiting
+    ]
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+from calendar import timegm
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from blog import comment_buffer, lookups, profile_cache
+from blog.models import Post
+
+# Условные GET-запросы страницы поста: браузер присылает If-None-Match
+# и If-Modified-Since, и при неизменной версии поста ответ 304 отдаётся
+# без запроса комментариев и отрисовки шаблона
+
+
+def get_variant(request):
+    # Форма комментария, CSRF-токен и ссылки правки различаются для
+    # анонимов и для каждого пользователя; ключ сессии меняется при входе
+    # вместе с CSRF-токеном
+    if not request.user.is_authenticated:
+        return 'anonymous'
+    return f'user:{request.user.pk}:{request.session.session_key}'
+
+
+def from_ns(version):
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+
+def get_validators(request, post_id):
+    # (ETag, Last-Modified) страницы поста или (None, None), если условная
+    # обработка неприменима; считается один раз на запрос
+    cached = getattr(request, '_post_validators', None)
+    if cached is not None:
+        return cached
+    validators = None, None
+    # Счётчик и время последнего комментария поддерживают сигналы Comment
+    # (blog.signals), поэтому версия меняется при любом добавлении
+    # и удалении комментария, в том числе из админки и каскадом
+    stamp = (
+        Post.objects.visible_to(request.user)
+        .filter(pk=post_id)
+        .values(
+            'updated_at', 'last_commented_at', 'comments_count',
+            'image', 'image_ready', 'author_id',
+        )
+        .first()
+    )
+    # Несуществующий пост даст 404 в представлении, а ещё не записанные
+    # комментарии автора видны только на полной странице
+    if stamp is not None and not (
+        request.user.is_authenticated
+        and comment_buffer.has_pending(request, post_id)
+    ):
+        # Категорию, местоположение и имя автора на странице меняют без
+        # сохранения поста: учитываются версии справочников и профиля.
+        # Смена имени комментатора обновляет updated_at постов с его
+        # комментариями (blog.signals)
+        versions = (
+            lookups.categories.get_version(),
+            lookups.locations.get_version(),
+            profile_cache.get_version(stamp['author_id']),
+        )
+        changed = max(
+            date for date in (
+                stamp['updated_at'],
+                stamp['last_commented_at'],
+                *map(from_ns, versions),
+            )
+            if date is not None
+        )
+        source = ':'.join(map(str, (
+            post_id, *stamp.values(), *versions, get_variant(request),
+        )))
+        validators = (
+            quote_etag(hashlib.md5(source.encode()).hexdigest()),
+            changed,
+        )
+    request._post_validators = validators
+    return validators
+
+
+def post_etag(request, post_id, **kwargs):
+    return get_validators(request, post_id)[0]
+
+
+def post_last_modified(request, post_id, **kwargs):
+    return get_validators(request, post_id)[1]
+
+
+def conditional_post_page(view):
+    # condition() для обычного представления страницы поста; для
+    # асинхронного та же логика повторена вручную, так как condition()
+    # в Django 3.2 не поддерживает сопрограммы
+    if not asyncio.iscoroutinefunction(view):
+        return condition(
+            etag_func=post_etag, last_modified_func=post_last_modified
+        )(view)
+
+    @wraps(view)
+    async def async_wrapper(request, *args, **kwargs):
+        etag, changed = await sync_to_async(get_validators)(
+            request, kwargs['post_id']
+        )
+        if etag is None:
+            return await view(request, *args, **kwargs)
+        last_modified = timegm(changed.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            response.setdefault('ETag', etag)
+            response.setdefault('Last-Modified', http_date(last_modified))
+        return response
+
+    return async_wrapper
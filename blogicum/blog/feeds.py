@@ -0,0 +1,82 @@
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blog.models import AuthorFeedEntry, CategoryFeedEntry, Post
+
+# Порядок строк материализованных лент, он же ключ курсора
+FEED_ORDERING = ('-pub_date', '-post_id')
+
+
+def is_visible(post):
+    # Категорию вызывающий код загружает вместе с постом (формы,
+    # select_related), иначе её подгрузит отдельный запрос
+    return bool(
+        post.is_live
+        and post.category_id is not None
+        and post.category.is_published
+    )
+
+
+def sync_post(post):
+    # Пост добавляется в ленты своей категории и автора, переносится
+    # при смене категории или даты либо удаляется из лент
+    if not is_visible(post):
+        remove_posts([post.pk])
+        return
+    CategoryFeedEntry.objects.update_or_create(
+        post_id=post.pk,
+        defaults={'category_id': post.category_id, 'pub_date': post.pub_date},
+    )
+    AuthorFeedEntry.objects.update_or_create(
+        post_id=post.pk,
+        defaults={'author_id': post.author_id, 'pub_date': post.pub_date},
+    )
+
+
+def remove_posts(post_ids):
+    # post_ids — список или подзапрос с id постов
+    CategoryFeedEntry.objects.filter(post_id__in=post_ids).delete()
+    AuthorFeedEntry.objects.filter(post_id__in=post_ids).delete()
+
+
+def add_posts(posts, batch_size=2000, using=DEFAULT_DB_ALIAS):
+    # Записи лент для всех постов набора; посты читаются потоком
+    rows = posts.using(using).order_by().values_list(
+        'pk', 'category_id', 'author_id', 'pub_date'
+    ).iterator(chunk_size=batch_size)
+    added = 0
+    while batch := list(islice(rows, batch_size)):
+        with transaction.atomic(using=using):
+            CategoryFeedEntry.objects.using(using).bulk_create(
+                CategoryFeedEntry(
+                    post_id=pk, category_id=category_id, pub_date=pub_date
+                )
+                for pk, category_id, _, pub_date in batch
+            )
+            AuthorFeedEntry.objects.using(using).bulk_create(
+                AuthorFeedEntry(
+                    post_id=pk, author_id=author_id, pub_date=pub_date
+                )
+                for pk, _, author_id, pub_date in batch
+            )
+        added += len(batch)
+    return added
+
+
+def sync_category(category):
+    # Снятие категории с публикации скрывает все её посты, возврат —
+    # показывает снова
+    posts = Post.objects.filter(category=category)
+    remove_posts(posts.values('pk'))
+    if category.is_published:
+        add_posts(posts.published())
+
+
+def rebuild(batch_size=2000, using=DEFAULT_DB_ALIAS):
+    # Одна транзакция: пока ленты перестраиваются, читатели видят
+    # прежние записи, а не пустые или неполные ленты
+    with transaction.atomic(using=using):
+        CategoryFeedEntry.objects.using(using).all().delete()
+        AuthorFeedEntry.objects.using(using).all().delete()
+        return add_posts(Post.objects.published(), batch_size, using)
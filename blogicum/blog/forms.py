@@ -2,6 +2,7 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.validators import validate_image_file_extension
 from blog.models import Post, Comment
 
 # Получение модели пользователя
@@ -16,6 +17,14 @@ class CommentForm(forms.ModelForm):
 
 # Форма для создания и редактирования постов
 class PostForm(forms.ModelForm):
+    # Фото принимается без декодирования в запросе: проверяется только
+    # расширение, а содержимое проверяет фоновая задача blog.process_image
+    image = forms.FileField(
+        label='Фото',
+        required=False,
+        validators=[validate_image_file_extension],
+    )
+
     # Исключаем поле 'author', так как оно будет автоматически заполняться текущим пользователем
     class Meta:
         model = Post
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog import lookups, profile_cache
+from core.metrics import record_cache
+
+CARD_TEMPLATE = 'includes/post_card.html'
+# Поколение кэша: меняется, когда правят категории или местоположения,
+# и разом делает недействительными все карточки. Оно хранится в общем
+# кэше сайта, чтобы смену увидели LRU всех процессов
+GENERATION_KEY = 'post_card:generation'
+
+
+class LRUCache:
+    # Локальный кэш процесса с вытеснением давно не использованных записей
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCache:
+    # Обёртка над любым бэкендом из CACHES с тем же интерфейсом, что у LRUCache
+    def __init__(self, alias, timeout=None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        cache.delete(GENERATION_KEY)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    # Бэкенд выбирается настройкой POST_CARD_CACHE: без ALIAS — LRU в памяти
+    # процесса, с ALIAS — соответствующий кэш из CACHES
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                options = settings.POST_CARD_CACHE
+                if options.get('ALIAS'):
+                    _backend = DjangoCache(
+                        options['ALIAS'], options.get('TIMEOUT')
+                    )
+                else:
+                    _backend = LRUCache(options.get('MAX_ENTRIES', 1000))
+    return _backend
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Потерянное (вытесненное) поколение заменяется новым,
+        # поэтому старые записи не могут вернуться
+        generation = time.time_ns()
+        cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def card_key(generation, post_id):
+    return f'post_card:{generation}:{post_id}'
+
+
+def card_version(post):
+    # Сброс записи LRU виден только своему процессу, поэтому версия
+    # покрывает всё, что выводит карточка: комментарии не трогают
+    # updated_at, а имя автора меняет версию его профиля
+    if post.updated_at is None:
+        return None
+    return (
+        f'{post.updated_at.isoformat()}:{post.comments_count}:'
+        f'{profile_cache.get_version(post.author_id)}'
+    )
+
+
+def render_post_card(post):
+    # Готовая карточка берётся из кэша, если версия поста не изменилась
+    backend = get_backend()
+    key = card_key(get_generation(), post.pk)
+    version = card_version(post)
+    cached = backend.get(key)
+    if cached is not None and cached[0] == version:
+        record_cache(hit=True)
+        return mark_safe(cached[1])
+    record_cache(hit=False)
+    lookups.attach(post)
+    html = render_to_string(CARD_TEMPLATE, {'post': post})
+    backend.set(key, (version, str(html)))
+    return mark_safe(html)
+
+
+# Сброс выполняется после коммита, иначе параллельный запрос успел бы
+# закэшировать ещё не изменённый пост под новым поколением
+def invalidate_post(post_id):
+    transaction.on_commit(
+        lambda: get_backend().delete(card_key(get_generation(), post_id))
+    )
+
+
+def invalidate_all():
+    transaction.on_commit(
+        lambda: cache.set(GENERATION_KEY, time.time_ns(), None)
+    )
@@ -0,0 +1,131 @@
+import os
+import struct
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Pillow импортируется внутри функций: модуль нужен веб-процессам ради
+# get_srcset, а сами изображения обрабатывают только воркеры задач
+
+# Форматы уменьшенных копий: расширение файла и имя формата Pillow
+FORMATS = (
+    ('webp', 'WEBP'),
+    ('jpg', 'JPEG'),
+)
+
+
+def derivative_name(name, width, extension):
+    # post_images/photo.png -> post_images/photo.w640.webp
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{extension}'
+
+
+def derivative_widths(original):
+    # Ширины копий для оригинала шириной original: не больше оригинала,
+    # но хотя бы одна
+    return [
+        width
+        for number, width in enumerate(settings.IMAGE_DERIVATIVE_WIDTHS)
+        if number == 0 or width <= original
+    ]
+
+
+def validate_image(name, storage=default_storage):
+    # Полная проверка файла Pillow. Не-картинки дают UnidentifiedImageError,
+    # слишком большие — DecompressionBombError, битые — ValidationError;
+    # ошибки хранилища не перехватываются
+    from PIL import Image
+
+    with storage.open(name) as source:
+        image = Image.open(source)
+        try:
+            image.verify()
+        except (OSError, SyntaxError, ValueError, struct.error) as error:
+            raise ValidationError(f'Файл {name} повреждён: {error}')
+
+
+def get_width(name, storage=default_storage):
+    # Ширина с учётом поворота из EXIF — та, от которой generate_derivatives
+    # отсчитывает ширины копий; читается только заголовок файла
+    from PIL import Image
+
+    with storage.open(name) as source:
+        image = Image.open(source)
+        # Ориентации 5–8 поворачивают изображение на 90°
+        if image.getexif().get(0x0112, 1) > 4:
+            return image.height
+        return image.width
+
+
+def strip_exif(name, storage=default_storage):
+    # Оригинал пересохраняется без EXIF (геометки, данные камеры);
+    # ориентация из EXIF применяется к пикселям заранее. Возвращает имя
+    # файла: хранилище может сохранить его под другим именем
+    from PIL import Image, ImageOps
+
+    with storage.open(name) as source:
+        image = Image.open(source)
+        if not image.getexif():
+            return name
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def has_derivatives(name, storage=default_storage):
+    width = settings.IMAGE_DERIVATIVE_WIDTHS[0]
+    extension = FORMATS[-1][0]
+    return storage.exists(derivative_name(name, width, extension))
+
+
+def generate_derivatives(name, storage=default_storage):
+    # Уменьшенные копии сохраняются рядом с оригиналом для каждой ширины
+    # из IMAGE_DERIVATIVE_WIDTHS, не превышающей ширину оригинала
+    from PIL import Image, ImageOps
+
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+    created = []
+    for width in derivative_widths(image.width):
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.LANCZOS)
+        for extension, image_format in FORMATS:
+            buffer = BytesIO()
+            resized.save(
+                buffer,
+                image_format,
+                quality=settings.IMAGE_DERIVATIVE_QUALITY,
+                optimize=True,
+            )
+            target = derivative_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            content = ContentFile(buffer.getvalue())
+            created.append(storage.save(target, content))
+    return created
+
+
+def delete_derivatives(name, storage=default_storage):
+    # Копии заменённого или удалённого оригинала; отсутствующие файлы
+    # хранилище пропускает
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        for extension, _ in FORMATS:
+            storage.delete(derivative_name(name, width, extension))
+
+
+def get_srcset(name, original, extension, storage=default_storage):
+    # Только созданные копии: маленький оригинал даёт меньше ширин.
+    # Набор вычисляется по ширине оригинала, без обращений к хранилищу
+    return ', '.join(
+        f'{storage.url(derivative_name(name, width, extension))} {width}w'
+        for width in derivative_widths(original)
+    )
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from blog.models import Category, Location, Post
+
+
+class LookupTable:
+    # Небольшой справочник целиком в памяти процесса. Версия в общем кэше
+    # меняется при каждом изменении таблицы; процесс, заметивший новую
+    # версию, перечитывает таблицу одним запросом. Изменения в обход
+    # сигналов (bulk_create, правка базы вручную) видны не позже чем
+    # через LOOKUP_TABLE_TIMEOUT секунд
+    def __init__(self, model, key_field=None):
+        self.model = model
+        self.key_field = key_field
+        self.version_key = f'lookup:{model._meta.label_lower}:version'
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0
+        # Пара словарей (по pk, по key_field) заменяется целиком
+        self._tables = ({}, {})
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            version = time.time_ns()
+            cache.set(self.version_key, version, None)
+        return version
+
+    def is_stale(self, version):
+        return (
+            version != self._version
+            or time.monotonic() - self._loaded_at
+            > settings.LOOKUP_TABLE_TIMEOUT
+        )
+
+    def load(self):
+        version = self.get_version()
+        if self.is_stale(version):
+            with self._lock:
+                if self.is_stale(version):
+                    objects = list(self.model.objects.all())
+                    by_key = {}
+                    if self.key_field:
+                        by_key = {
+                            getattr(obj, self.key_field): obj
+                            for obj in objects
+                        }
+                    self._tables = ({obj.pk: obj for obj in objects}, by_key)
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._tables
+
+    def get(self, pk):
+        return self.load()[0].get(pk)
+
+    def get_by_key(self, value):
+        return self.load()[1].get(value)
+
+    def invalidate(self):
+        # Новая версия публикуется после коммита, иначе другой процесс
+        # успеет перечитать таблицу без изменений и запомнить её под новой
+        # версией
+        transaction.on_commit(
+            lambda: cache.set(self.version_key, time.time_ns(), None)
+        )
+
+
+categories = LookupTable(Category, key_field='slug')
+locations = LookupTable(Location)
+
+
+def invalidate_all():
+    # После массовой загрузки в обход сигналов
+    categories.invalidate()
+    locations.invalidate()
+
+
+def get_published_category(slug):
+    category = categories.get_by_key(slug)
+    if category is None or not category.is_published:
+        return None
+    return category
+
+
+def attach(post):
+    # Категория и местоположение поста берутся из справочников, если они
+    # не загружены запросом; неизвестный id оставляет обычную подгрузку
+    for field, table in (('category', categories), ('location', locations)):
+        descriptor = getattr(Post, field)
+        related_id = getattr(post, f'{field}_id')
+        if related_id is None or descriptor.is_cached(post):
+            continue
+        related = table.get(related_id)
+        if related is not None:
+            descriptor.field.set_cached_value(post, related)
@@ -0,0 +1,211 @@
+import json
+import multiprocessing
+import random
+import time
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.urls import reverse
+
+from blog import comment_buffer
+from blog.models import Comment, Post
+from core.benchmarks import summarize
+
+User = get_user_model()
+
+# Метка комментариев бенчмарка: по ней они удаляются после прогона
+MARKER = '[bench_concurrency]'
+
+# Профили базы: настройки SQLite по умолчанию и SQLITE_PRAGMAS профиля
+# prod (команду для сравнения запускают с DJANGO_ENV=prod)
+PROFILES = {
+    'default': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'conn_max_age': 0,
+    },
+    'tuned': {
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'conn_max_age': settings.DATABASES[DEFAULT_DB_ALIAS]['CONN_MAX_AGE'],
+    },
+}
+
+
+def apply_profile(profile):
+    # Новые соединения создаются с настройками профиля
+    connections.close_all()
+    settings.SQLITE_PRAGMAS = profile['pragmas']
+    connections.databases[DEFAULT_DB_ALIAS]['CONN_MAX_AGE'] = (
+        profile['conn_max_age']
+    )
+
+
+def work(profile, user_id, post_ids, duration, write_ratio, queue):
+    # Цикл одного процесса нагрузки; при запуске через spawn (Windows,
+    # macOS) Django настраивается с нуля
+    if not apps.ready:
+        django.setup()
+    apply_profile(profile)
+    # Замеряется база, а не лимит частоты комментариев
+    settings.COMMENT_RATE = None
+    client = Client(
+        HTTP_HOST=settings.ALLOWED_HOSTS[0], REMOTE_ADDR='192.0.2.1'
+    )
+    client.force_login(User.objects.get(pk=user_id))
+    generator = random.Random()
+    results = {'reads': [], 'writes': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        post_id = generator.choice(post_ids)
+        write = generator.random() < write_ratio
+        started = time.perf_counter()
+        try:
+            if write:
+                response = client.post(
+                    reverse('blog:add_comment', args=(post_id,)),
+                    {'text': f'{MARKER} {generator.random()}'},
+                )
+            else:
+                response = client.get(
+                    reverse('blog:post_detail', args=(post_id,))
+                )
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            results['writes' if write else 'reads'].append(elapsed)
+        else:
+            results['errors'] += 1
+    # Дочерний процесс завершается без atexit: очередь комментариев
+    # записывается явно
+    comment_buffer.buffer.flush()
+    connections.close_all()
+    queue.put(results)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает базу смесью чтений страниц постов и добавлений '
+        'комментариев из нескольких процессов и сравнивает профили SQLite: '
+        'настройки по умолчанию и SQLITE_PRAGMAS с постоянными '
+        'соединениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля запросов, добавляющих комментарий.',
+        )
+        parser.add_argument(
+            '--profiles', nargs='+', choices=PROFILES,
+            default=list(PROFILES),
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def apply_profile(self, profile):
+        # journal_mode хранится в файле базы и переключается явно
+        apply_profile(profile)
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        connections.close_all()
+        return journal_mode
+
+    def run(self, profile, users, post_ids, options):
+        queue = multiprocessing.Queue()
+        # Процессы вместо потоков: иначе замер упирается в GIL, а не в базу
+        workers = [
+            multiprocessing.Process(
+                target=work,
+                args=(
+                    profile, users[number % len(users)], post_ids,
+                    options['duration'], options['write_ratio'], queue,
+                ),
+            )
+            for number in range(options['processes'])
+        ]
+        connections.close_all()
+        for worker in workers:
+            worker.start()
+        results = {'reads': [], 'writes': [], 'errors': 0}
+        for _ in workers:
+            partial = queue.get()
+            results['reads'] += partial['reads']
+            results['writes'] += partial['writes']
+            results['errors'] += partial['errors']
+        for worker in workers:
+            worker.join()
+        duration = options['duration']
+        return {
+            'reads_per_second': round(len(results['reads']) / duration, 1),
+            'writes_per_second': round(len(results['writes']) / duration, 1),
+            'errors': results['errors'],
+            'reads': summarize(results['reads']),
+            'writes': summarize(results['writes']),
+        }
+
+    def cleanup(self):
+        comments = Comment.objects.filter(text__startswith=MARKER)
+        post_ids = set(comments.values_list('post_id', flat=True))
+        comments.delete()
+        Post.objects.filter(pk__in=post_ids).recount_comments()
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Бенчмарк сравнивает профили SQLite.')
+        if 'tuned' in options['profiles'] and not settings.SQLITE_PRAGMAS:
+            raise CommandError(
+                'SQLITE_PRAGMAS пуст: для профиля tuned запустите команду '
+                'с DJANGO_ENV=prod.'
+            )
+        post_ids = list(
+            Post.objects.published().values_list('pk', flat=True)[:1000]
+        )
+        users = list(
+            User.objects.order_by('pk').values_list('pk', flat=True)
+            [:options['processes']]
+        )
+        if not post_ids or not users:
+            raise CommandError(
+                'Нет данных; заполните базу командой generate_bench_data.'
+            )
+
+        report = {
+            'processes': options['processes'],
+            'duration': options['duration'],
+            'write_ratio': options['write_ratio'],
+            'profiles': {},
+        }
+        try:
+            for name in options['profiles']:
+                journal_mode = self.apply_profile(PROFILES[name])
+                result = self.run(PROFILES[name], users, post_ids, options)
+                result['journal_mode'] = journal_mode
+                report['profiles'][name] = result
+                self.stdout.write(
+                    f"{name} ({journal_mode}): "
+                    f"чтений {result['reads_per_second']}/с "
+                    f"(p95 {result['reads']['p95_ms']} мс), "
+                    f"записей {result['writes_per_second']}/с "
+                    f"(p95 {result['writes']['p95_ms']} мс), "
+                    f"ошибок {result['errors']}"
+                )
+        finally:
+            # Настройки проекта восстанавливаются, комментарии бенчмарка
+            # удаляются
+            self.apply_profile(PROFILES['tuned'])
+            self.cleanup()
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
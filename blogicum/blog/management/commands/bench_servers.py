@@ -0,0 +1,225 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Category, Post
+from core.benchmarks import summarize
+
+User = get_user_model()
+
+
+def fetch(url, headers=None):
+    started = time.perf_counter()
+    try:
+        request = urllib.request.Request(url, headers=headers or {})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает проект под gunicorn с синхронными воркерами (WSGI) и '
+        'с воркерами uvicorn и асинхронными представлениями (ASGI) и '
+        'сравнивает пропускную способность под одинаковой конкурентной '
+        'нагрузкой. Запросы идут от имени пользователя, поэтому страницы '
+        'не отдаются из кэша для анонимных посетителей и нагрузка '
+        'приходится на чтение из базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument(
+            '--duration', type=float, default=10.0,
+            help='Длительность нагрузки на каждый сервер, секунд.',
+        )
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число процессов gunicorn у каждого сервера.',
+        )
+        parser.add_argument(
+            '--user',
+            help='Имя пользователя, от которого идут запросы; по умолчанию '
+                 'первый пользователь в базе.',
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Запросы без входа: главная и категории отдаются из кэша '
+                 'страниц, а не из базы.',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Адрес страницы; можно указать несколько раз.',
+        )
+        parser.add_argument(
+            '--servers', nargs='+', choices=('wsgi', 'asgi'),
+            default=['wsgi', 'asgi'],
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def server_command(self, server, port, workers):
+        # Оба сервера — gunicorn с одинаковым числом процессов, различается
+        # только класс воркера: сравнивается WSGI с ASGI, а не
+        # отладочный runserver с боевым сервером
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+        ]
+        if server == 'wsgi':
+            return command + ['blogicum.wsgi:application']
+        return command + [
+            '--worker-class', 'uvicorn.workers.UvicornWorker',
+            'blogicum.asgi:application',
+        ]
+
+    def get_paths(self):
+        # Главная, её вторая страница, лента категории и страница поста
+        published = Post.objects.published()
+        category = Category.objects.filter(
+            is_published=True, posts__in=published
+        ).first()
+        post = published.order_by('-comments_count').first()
+        if category is None or post is None:
+            raise CommandError(
+                'Нет данных; заполните базу командой generate_bench_data.'
+            )
+        index_url = reverse('blog:index')
+        return [
+            index_url,
+            f'{index_url}?page=2',
+            reverse('blog:category_posts', args=(category.slug,)),
+            reverse('blog:post_detail', args=(post.pk,)),
+        ]
+
+    def get_headers(self, options):
+        # Cookie сессии пользователя: авторизованные запросы не попадают
+        # в кэш страниц для анонимов
+        if options['anonymous']:
+            return {}
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user = users.first()
+        if user is None:
+            raise CommandError('Нет пользователя для авторизованных запросов.')
+        client = Client()
+        client.force_login(user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        return {'Cookie': f'{cookie.key}={cookie.value}'}
+
+    def wait_until_ready(self, url, headers, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError('Сервер завершился при запуске.')
+            if fetch(url, headers)[0]:
+                return
+            time.sleep(0.2)
+        raise CommandError(f'Сервер не ответил за {timeout} с.')
+
+    def load(self, base_url, paths, headers, concurrency, duration):
+        deadline = time.monotonic() + duration
+
+        def worker(index):
+            results = []
+            position = index
+            while time.monotonic() < deadline:
+                path = paths[position % len(paths)]
+                results.append(fetch(base_url + path, headers))
+                position += 1
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            batches = list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+        results = [result for batch in batches for result in batch]
+        latencies = [latency for ok, latency in results if ok]
+        return {
+            'requests': len(results),
+            'errors': sum(1 for ok, _ in results if not ok),
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'latency': summarize(latencies),
+        }
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec('gunicorn') is None:
+            raise CommandError('Для сравнения нужен gunicorn (pip install).')
+        paths = options['paths'] or self.get_paths()
+        headers = self.get_headers(options)
+        port = options['port']
+        base_url = f'http://127.0.0.1:{port}'
+        # Отладочный режим и панель отладки исказили бы результаты,
+        # поэтому серверы запускаются с профилем prod. Ключ тот же, что
+        # у этого процесса, иначе cookie сессии не пройдёт проверку
+        env = dict(
+            os.environ,
+            DJANGO_ENV='prod',
+            DJANGO_SECRET_KEY=settings.SECRET_KEY,
+            DJANGO_ALLOWED_HOSTS='127.0.0.1',
+            BLOGICUM_ASYNC_VIEWS='0',
+        )
+        report = {
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'workers': options['workers'],
+            'anonymous': options['anonymous'],
+            'paths': paths,
+            'servers': {},
+        }
+        for server in options['servers']:
+            server_env = dict(
+                env, BLOGICUM_ASYNC_VIEWS='1' if server == 'asgi' else '0'
+            )
+            process = subprocess.Popen(
+                self.server_command(server, port, options['workers']),
+                cwd=settings.BASE_DIR,
+                env=server_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                self.wait_until_ready(base_url + paths[0], headers, process)
+                # Прогрев: кэши шаблонов, соединения, кэш карточек
+                self.load(
+                    base_url, paths, headers, options['concurrency'], 1.0
+                )
+                result = self.load(
+                    base_url, paths, headers, options['concurrency'],
+                    options['duration'],
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            report['servers'][server] = result
+            self.stdout.write(
+                f"{server}: {result['requests_per_second']} req/s, "
+                f"p50 {result['latency']['p50_ms']} ms, "
+                f"p99 {result['latency']['p99_ms']} ms, "
+                f"ошибок {result['errors']}"
+            )
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
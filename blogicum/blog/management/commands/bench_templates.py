@@ -0,0 +1,134 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog import fragments
+from blog.models import Category, Location, Post
+from core.benchmarks import summarize
+
+User = get_user_model()
+
+TEMPLATE = 'blog/index.html'
+
+# Профили загрузчиков: как в DEBUG и как в рабочем окружении
+PROFILES = {
+    'uncached': settings.TEMPLATE_LOADERS,
+    'cached': [
+        ('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS),
+    ],
+}
+
+
+@contextmanager
+def template_loaders(loaders):
+    # Подмена загрузчиков движка; template_loaders — cached_property,
+    # его значение сбрасывается, чтобы загрузчики создались заново
+    engine = engines['django'].engine
+    original = engine.loaders
+    engine.loaders = loaders
+    engine.__dict__.pop('template_loaders', None)
+    try:
+        yield
+    finally:
+        engine.loaders = original
+        engine.__dict__.pop('template_loaders', None)
+
+
+def make_posts(count):
+    # Посты в памяти, без базы: замеряется только отрисовка
+    author = User(id=1, username='author')
+    category = Category(
+        id=1, title='Категория', slug='category', is_published=True
+    )
+    location = Location(id=1, name='Место', is_published=True)
+    now = timezone.now()
+    return [
+        Post(
+            id=number,
+            title=f'Пост {number}',
+            text='Текст поста. ' * 40,
+            pub_date=now,
+            updated_at=now,
+            is_published=True,
+            author=author,
+            category=category,
+            location=location,
+            comments_count=number % 7,
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        f'Микробенчмарк отрисовки {TEMPLATE} с разным числом карточек '
+        'постов для загрузчиков шаблонов с кэшем и без.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cards', type=int, nargs='+', default=[3, 50, 500]
+        )
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument(
+            '--card-cache', action='store_true',
+            help='Не сбрасывать кэш карточек между отрисовками.',
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def render(self, request, page_obj, card_cache):
+        if not card_cache:
+            fragments.get_backend().clear()
+        started = time.perf_counter()
+        render_to_string(TEMPLATE, {'page_obj': page_obj}, request=request)
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        report = {
+            'template': TEMPLATE,
+            'iterations': options['iterations'],
+            'card_cache': options['card_cache'],
+            'profiles': {},
+        }
+        for profile, loaders in PROFILES.items():
+            results = report['profiles'][profile] = {}
+            for count in options['cards']:
+                paginator = Paginator(make_posts(count), count)
+                page_obj = paginator.get_page(1)
+                page_obj.elided_page_range = paginator.get_elided_page_range(1)
+                with template_loaders(loaders):
+                    # Первая отрисовка включает разбор шаблонов
+                    first = self.render(
+                        request, page_obj, options['card_cache']
+                    )
+                    latencies = [
+                        self.render(request, page_obj, options['card_cache'])
+                        for _ in range(options['iterations'])
+                    ]
+                result = summarize(latencies)
+                result['first_ms'] = round(first * 1000, 3)
+                results[count] = result
+                self.stdout.write(
+                    f'{profile}, карточек {count}: первая '
+                    f"{result['first_ms']} мс, p50 {result['p50_ms']} мс, "
+                    f"p95 {result['p95_ms']} мс"
+                )
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,182 @@
+import json
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import fragments, page_cache, profile_cache
+from blog.models import Category, Comment, Post
+from core.benchmarks import summarize
+
+User = get_user_model()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку (процентили) и число SQL-запросов горячих '
+        'страниц блога на текущих данных и пишет JSON-отчёт, который '
+        'можно сравнивать между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Сбрасывать кэши страниц, профилей и карточек перед каждым '
+                 'запросом.',
+        )
+        parser.add_argument(
+            '--user', help='Выполнять запросы от имени этого пользователя.'
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+        parser.add_argument(
+            '--baseline', help='Прошлый отчёт для сравнения p50 и запросов.'
+        )
+
+    def get_targets(self):
+        # Самые тяжёлые примеры каждой страницы: крупнейшая категория,
+        # самый активный автор, самый обсуждаемый пост
+        published = Post.objects.published()
+        category = (
+            Category.objects.filter(is_published=True)
+            .annotate(total=Count(
+                'posts', filter=Q(posts__in=published)
+            ))
+            .order_by('-total')
+            .first()
+        )
+        author = (
+            User.objects.annotate(total=Count('posts'))
+            .order_by('-total')
+            .first()
+        )
+        post = published.order_by('-comments_count').first()
+        if category is None or author is None or post is None:
+            raise CommandError(
+                'Нет данных; заполните базу командой generate_bench_data.'
+            )
+        pages = max(published.count() // settings.POSTS_PER_PAGE, 1)
+        index_url = reverse('blog:index')
+        return {
+            'index': index_url,
+            'index_deep_page': f'{index_url}?page={pages // 2 or 1}',
+            'category_posts': reverse(
+                'blog:category_posts', args=(category.slug,)
+            ),
+            'profile': reverse('blog:profile', args=(author.username,)),
+            'post_detail': reverse('blog:post_detail', args=(post.pk,)),
+        }
+
+    def measure(self, client, url, iterations, warmup, cold):
+        for _ in range(warmup):
+            client.get(url)
+        latencies = []
+        queries = []
+        status = None
+        for _ in range(iterations):
+            if cold:
+                fragments.invalidate_all()
+                page_cache.invalidate_public_pages()
+                profile_cache.invalidate_all()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(url)
+                latencies.append(time.perf_counter() - started)
+            queries.append(len(context.captured_queries))
+            status = response.status_code
+        return {
+            'url': url,
+            'status': status,
+            'queries': max(queries, default=0),
+            'latency': summarize(latencies),
+        }
+
+    def compare(self, report, baseline_path):
+        with open(baseline_path, encoding='utf-8') as file:
+            baseline = json.load(file)
+        self.stdout.write(f"Сравнение с {baseline.get('revision')}:")
+        for name, result in report['views'].items():
+            previous = baseline['views'].get(name)
+            if previous is None:
+                continue
+            before = previous['latency']['p50_ms']
+            after = result['latency']['p50_ms']
+            change = (after - before) / before * 100 if before else 0.0
+            self.stdout.write(
+                f'  {name}: p50 {before} -> {after} мс ({change:+.1f}%), '
+                f"запросов {previous['queries']} -> {result['queries']}"
+            )
+
+    def handle(self, *args, **options):
+        # Адрес не из INTERNAL_IPS, чтобы не включалась панель отладки
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0],
+                        REMOTE_ADDR='192.0.2.1')
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Нет пользователя {options['user']}.")
+            client.force_login(user)
+
+        report = {
+            'revision': git_revision(),
+            'created_at': timezone.now().isoformat(),
+            'options': {
+                'iterations': options['iterations'],
+                'cold': options['cold'],
+                'user': options['user'],
+            },
+            'settings': {
+                'DEBUG': settings.DEBUG,
+                'POSTS_PAGINATION': settings.POSTS_PAGINATION,
+                'SEARCH_BACKEND': settings.SEARCH_BACKEND,
+                'database': connection.vendor,
+            },
+            'data': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'views': {},
+        }
+        for name, url in self.get_targets().items():
+            result = self.measure(
+                client, url, options['iterations'], options['warmup'],
+                options['cold'],
+            )
+            report['views'][name] = result
+            self.stdout.write(
+                f"{name}: p50 {result['latency']['p50_ms']} мс, "
+                f"p95 {result['latency']['p95_ms']} мс, "
+                f"запросов {result['queries']}"
+            )
+
+        if options['baseline']:
+            self.compare(report, options['baseline'])
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,119 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import (
+    AuthorFeedEntry,
+    Category,
+    CategoryFeedEntry,
+    Post,
+)
+from blog.paginators import CursorPaginator
+from blog.views import LIMIT_POSTS
+
+User = get_user_model()
+
+# Признаки плохого плана: полный просмотр таблицы без индекса
+# или сортировка во временном B-дереве
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+\s*$')
+# Страница по курсору должна начинаться с поиска по диапазону индекса;
+# просмотр индекса с начала замедляется с глубиной ленты
+INDEX_SCAN = re.compile(r'\bSCAN (TABLE )?\w+ USING (COVERING )?INDEX')
+TEMP_SORT = re.compile(
+    r'USE TEMP B-TREE FOR (RIGHT PART OF )?(ORDER|GROUP) BY'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает EXPLAIN QUERY PLAN для запросов лент (главная, категория, '
+        'профиль) и с флагом --check завершается ошибкой при полном '
+        'просмотре таблицы или сортировке без индекса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='slug категории для примера')
+        parser.add_argument('--author', help='username автора для примера')
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Вернуть ошибку, если в плане есть SCAN или TEMP B-TREE.',
+        )
+
+    def get_queries(self, category_id, author_id):
+        # Те же наборы запросов, что строят представления blog.views
+        feed = Post.objects.published().for_feed()
+        # Ленты категорий и авторов читаются из материализованных таблиц
+        category_feed = CategoryFeedEntry.objects.filter(
+            category_id=category_id
+        ).select_related('post__author')
+        owner_feed = Post.objects.for_feed().filter(author_id=author_id)
+        visitor_feed = AuthorFeedEntry.objects.filter(
+            author_id=author_id
+        ).select_related('post__author')
+        return (
+            ('index', feed[:LIMIT_POSTS]),
+            ('index: count', feed),
+            ('index: cursor', self.next_page(feed, Post)),
+            ('category_posts', category_feed[:LIMIT_POSTS]),
+            ('category_posts: count', category_feed),
+            ('category_posts: cursor', self.next_page(
+                category_feed, CategoryFeedEntry
+            )),
+            ('profile (owner)', owner_feed[:LIMIT_POSTS]),
+            ('profile (visitor)', visitor_feed[:LIMIT_POSTS]),
+            ('profile (visitor): count', visitor_feed),
+        )
+
+    def next_page(self, queryset, model):
+        # Следующая страница в курсорном режиме (POSTS_PAGINATION = 'cursor')
+        cursor = CursorPaginator(queryset, LIMIT_POSTS, model._meta.ordering)
+        return queryset.order_by(*cursor.ordering).filter(
+            cursor.keyset_filter([timezone.now(), 0], backward=False)
+        )[:LIMIT_POSTS + 1]
+
+    def is_problem(self, label, line):
+        if FULL_SCAN.search(line) or TEMP_SORT.search(line):
+            return True
+        return label.endswith(': cursor') and bool(INDEX_SCAN.search(line))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'EXPLAIN QUERY PLAN поддерживается только для SQLite.'
+            )
+        category = Category.objects.filter(
+            **({'slug': options['category']} if options['category'] else {})
+        ).first()
+        author = User.objects.filter(
+            **({'username': options['author']} if options['author'] else {})
+        ).first()
+
+        problems = []
+        for label, queryset in self.get_queries(
+            category.pk if category else 0, author.pk if author else 0
+        ):
+            # Для подсчёта страниц пагинатор выполняет COUNT по тому же набору
+            if label.endswith(': count'):
+                queryset = queryset.order_by().values('pk')
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            for line in plan.splitlines():
+                if self.is_problem(label, line):
+                    problems.append(f'{label}: {line.strip()}')
+
+        if not problems:
+            self.stdout.write(
+                self.style.SUCCESS('Все запросы используют индексы.')
+            )
+            return
+        for problem in problems:
+            self.stderr.write(self.style.WARNING(problem))
+        if options['check']:
+            raise CommandError(
+                f'Найдено проблем в планах запросов: {len(problems)}.'
+            )
@@ -0,0 +1,55 @@
+import sys
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+
+# Модели по умолчанию в порядке зависимостей: сначала те, на кого ссылаются
+DEFAULT_MODELS = (
+    'users.MyUser',
+    'blog.Location',
+    'blog.Category',
+    'blog.Post',
+    'blog.Comment',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает данные в NDJSON (формат jsonl, совместимый с '
+        'loaddata и fast_load): записи читаются из базы пачками через '
+        'iterator(), память не растёт с объёмом данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', default=DEFAULT_MODELS,
+            help='Модели вида app_label.Model в порядке зависимостей.',
+        )
+        parser.add_argument(
+            '-o', '--output', help='Файл; по умолчанию стандартный вывод.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as error:
+            raise CommandError(error)
+
+        stream = (
+            open(options['output'], 'w', encoding='utf-8')
+            if options['output'] else sys.stdout
+        )
+        try:
+            for model in models:
+                records = (
+                    model._base_manager.order_by('pk')
+                    .iterator(chunk_size=options['chunk_size'])
+                )
+                serializers.serialize('jsonl', records, stream=stream)
+                if options['output']:
+                    self.stdout.write(f'{model._meta.label}: выгружено')
+        finally:
+            if options['output']:
+                stream.close()
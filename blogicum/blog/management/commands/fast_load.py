@@ -0,0 +1,161 @@
+import json
+from contextlib import contextmanager
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog import feeds, fragments, lookups, page_cache, profile_cache, search
+
+
+@contextmanager
+def preserve_dates(model):
+    # bulk_create проставляет поля auto_now/auto_now_add текущим временем;
+    # на время загрузки они отключаются, чтобы сохранить даты из выгрузки
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает NDJSON-выгрузку (fast_export или dumpdata '
+        '--format jsonl): записи читаются построчно и пишутся через '
+        'bulk_create пачками, каждая пачка в своей транзакции; проверка '
+        'внешних ключей выполняется один раз в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .jsonl')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.connection = connections[self.using]
+        self.models = set()
+        self.loaded = 0
+
+        # Проверка внешних ключей отключается вне транзакций (в SQLite
+        # PRAGMA внутри транзакции не действует): пачки могут ссылаться
+        # на записи из следующих пачек
+        with self.connection.constraint_checks_disabled():
+            with open(options['path'], encoding='utf-8') as stream:
+                self.load(stream)
+        table_names = [model._meta.db_table for model in self.models]
+        self.connection.check_constraints(table_names=table_names)
+        self.reset_sequences()
+
+        # bulk_create не отправляет сигналы: поисковый индекс, ленты,
+        # счётчики пользователей и кэши обновляются отдельно
+        if any(model._meta.label == 'blog.Post' for model in self.models):
+            feeds.rebuild(self.batch_size, self.using)
+            self.rebuild_search_index()
+        labels = {model._meta.label for model in self.models}
+        if labels & {'blog.Post', 'blog.Comment'}:
+            users = get_user_model().objects.using(self.using)
+            users.recount_posts()
+            users.recount_comments()
+        lookups.invalidate_all()
+        fragments.invalidate_all()
+        page_cache.invalidate_public_pages()
+        profile_cache.invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Загружено объектов: {self.loaded}.')
+        )
+
+    def rebuild_search_index(self):
+        # Индекс FTS5 лежит в той же базе, что и посты; индекс в памяти
+        # каждый процесс строит сам при первом поиске
+        if not (
+            settings.SEARCH_BACKEND == 'fts5'
+            and search.SQLiteFTSBackend.is_supported(self.connection)
+        ):
+            return
+        backend = search.SQLiteFTSBackend()
+        backend.create_table(self.connection)
+        with transaction.atomic(using=self.using):
+            backend.clear(self.connection)
+            for posts in search.iter_post_chunks(
+                self.batch_size, self.using
+            ):
+                backend.index_posts(posts, self.connection)
+
+    def records(self, stream):
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+    def load(self, stream):
+        objects = Deserializer(
+            self.records(stream), using=self.using, ignorenonexistent=True
+        )
+        try:
+            # Подряд идущие записи одной модели пишутся пачками
+            for model, group in groupby(
+                objects, key=lambda item: item.object.__class__
+            ):
+                while batch := list(islice(group, self.batch_size)):
+                    self.flush(model, batch)
+        except DeserializationError as error:
+            raise CommandError(error)
+
+    def flush(self, model, batch):
+        self.models.add(model)
+        with preserve_dates(model), transaction.atomic(using=self.using):
+            model._base_manager.using(self.using).bulk_create(
+                [item.object for item in batch]
+            )
+            # Связи многие-ко-многим пишутся напрямую в промежуточные таблицы
+            for name, through, source, target in self.m2m_tables(model):
+                rows = [
+                    through(**{source: item.object.pk, target: related})
+                    for item in batch
+                    for related in item.m2m_data.get(name, ())
+                ]
+                if rows:
+                    self.models.add(through)
+                    through._base_manager.using(self.using).bulk_create(rows)
+        self.loaded += len(batch)
+        self.stdout.write(f'{model._meta.label}: {self.loaded}')
+
+    def m2m_tables(self, model):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if through._meta.auto_created:
+                yield (
+                    field.name,
+                    through,
+                    field.m2m_column_name(),
+                    field.m2m_reverse_name(),
+                )
+
+    def reset_sequences(self):
+        # Явные id не сдвигают последовательности в PostgreSQL и Oracle
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.models)
+        )
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
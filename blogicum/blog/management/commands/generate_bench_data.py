@@ -0,0 +1,210 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog import lookups
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Префикс имён пользователей и slug категорий синтетических данных:
+# по нему --clear находит и удаляет прошлую генерацию
+PREFIX = 'bench'
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местоположениями, постами и комментариями для бенчмарков '
+        '(bulk_create пачками по --batch-size).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--comments', type=int, default=50000,
+            help='Общее число комментариев; распределяются по постам '
+                 'неравномерно, как в живом блоге.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикации.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковые параметры дают одинаковые '
+                 'данные.',
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить ранее сгенерированные данные перед генерацией.',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        if options['clear']:
+            self.clear()
+        users = self.create_users(options['users'])
+        categories = self.create_categories(options['categories'])
+        locations = self.create_locations(options['locations'])
+        post_ids = self.create_posts(
+            options['posts'], users, categories, locations, options['days']
+        )
+        self.create_comments(options['comments'], users, post_ids)
+
+        # bulk_create не отправляет сигналы: счётчики комментариев,
+        # поисковый индекс, ленты и кэши приводятся в порядок отдельно
+        call_command('recount_comments', stdout=self.stdout)
+        call_command('recount_user_stats', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('rebuild_feeds', stdout=self.stdout)
+        # Новые категории и местоположения — в справочники процессов сайта
+        lookups.invalidate_all()
+        self.stdout.write(self.style.SUCCESS('Данные для бенчмарков созданы.'))
+
+    def bulk_create(self, model, objects):
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+
+    def new_ids(self, model, last_id):
+        # SQLite в Django 3.2 не возвращает id из bulk_create,
+        # поэтому новые записи находятся по диапазону первичных ключей
+        return list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def last_id(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    def clear(self):
+        with transaction.atomic():
+            Post.objects.filter(author__username__startswith=PREFIX).delete()
+            deleted, _ = User.objects.filter(
+                username__startswith=f'{PREFIX}_'
+            ).delete()
+            Category.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+            Location.objects.filter(name__startswith=f'{PREFIX}: ').delete()
+        self.stdout.write(f'Удалены данные прошлой генерации ({deleted}).')
+
+    def create_users(self, count):
+        # Один хэш пароля на всех: хэширование — самая медленная часть
+        password = make_password(PREFIX)
+        start = User.objects.filter(username__startswith=f'{PREFIX}_').count()
+        last_id = self.last_id(User)
+        self.bulk_create(User, [
+            User(
+                username=f'{PREFIX}_{start + number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=f'{PREFIX}_{start + number}@example.com',
+                password=password,
+            )
+            for number in range(count)
+        ])
+        ids = self.new_ids(User, last_id)
+        self.stdout.write(f'Пользователей: {len(ids)}')
+        return ids
+
+    def create_categories(self, count):
+        start = Category.objects.filter(slug__startswith=f'{PREFIX}-').count()
+        last_id = self.last_id(Category)
+        self.bulk_create(Category, [
+            Category(
+                title=self.fake.sentence(nb_words=2)[:256],
+                description=self.fake.paragraph(),
+                slug=f'{PREFIX}-{start + number}',
+                # Небольшая доля снятых с публикации категорий
+                is_published=self.random.random() > 0.1,
+            )
+            for number in range(count)
+        ])
+        ids = self.new_ids(Category, last_id)
+        self.stdout.write(f'Категорий: {len(ids)}')
+        return ids
+
+    def create_locations(self, count):
+        last_id = self.last_id(Location)
+        self.bulk_create(Location, [
+            Location(name=f'{PREFIX}: {self.fake.city()}')
+            for _ in range(count)
+        ])
+        ids = self.new_ids(Location, last_id)
+        self.stdout.write(f'Местоположений: {len(ids)}')
+        return ids
+
+    def create_posts(self, count, users, categories, locations, days):
+        last_id = self.last_id(Post)
+        period = timedelta(days=days).total_seconds()
+        for batch in batched(range(count), self.batch_size):
+            posts = []
+            for _ in batch:
+                # 2% постов отложены, 5% сняты с публикации
+                offset = self.random.uniform(-period, period * 0.02)
+                is_published = self.random.random() > 0.05
+                posts.append(Post(
+                    title=self.fake.sentence(nb_words=5)[:256],
+                    text='\n\n'.join(self.fake.paragraphs(nb=3)),
+                    pub_date=self.now + timedelta(seconds=offset),
+                    # bulk_create не вызывает save(), флаг задаётся явно
+                    is_live=is_published and offset <= 0,
+                    author_id=self.random.choice(users),
+                    category_id=self.random.choice(categories),
+                    location_id=(
+                        self.random.choice(locations)
+                        if locations and self.random.random() > 0.3
+                        else None
+                    ),
+                    is_published=is_published,
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+        ids = self.new_ids(Post, last_id)
+        self.stdout.write(f'Постов: {len(ids)}')
+        return ids
+
+    def create_comments(self, count, users, post_ids):
+        if not post_ids:
+            return
+        # Парето-распределение: немного постов собирают большую часть
+        # комментариев
+        weights = [self.random.paretovariate(1.2) for _ in post_ids]
+        targets = self.random.choices(post_ids, weights, k=count)
+        created = 0
+        for batch in batched(targets, self.batch_size):
+            with transaction.atomic():
+                Comment.objects.bulk_create([
+                    Comment(
+                        text=self.fake.sentence(nb_words=12),
+                        post_id=post_id,
+                        author_id=self.random.choice(users),
+                    )
+                    for post_id in batch
+                ])
+            created += len(batch)
+        self.stdout.write(f'Комментариев: {created}')
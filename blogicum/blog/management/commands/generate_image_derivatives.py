@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import images
+from blog.models import Category, Post
+
+
+def process_image(name, force):
+    # Выполняется в дочернем процессе пула
+    count = 0
+    if force or not images.has_derivatives(name):
+        count = len(images.generate_derivatives(name))
+    return name, count, images.get_width(name)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии уже загруженных изображений постов '
+        'и категорий в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов (по умолчанию — число ядер).',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии, даже если они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (Post, Category):
+            names.update(
+                model.objects.exclude(image='')
+                .values_list('image', flat=True)
+                .iterator()
+            )
+        if not names:
+            self.stdout.write('Изображений нет.')
+            return
+
+        created = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=django.setup
+        ) as pool:
+            futures = [
+                pool.submit(process_image, name, options['force'])
+                for name in sorted(names)
+            ]
+            for future in as_completed(futures):
+                try:
+                    name, count, width = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(str(error)))
+                    continue
+                created += count
+                # По ширине тег responsive_image строит наборы копий;
+                # новая отметка изменения сбрасывает карточки постов
+                Post.objects.filter(image=name).update(
+                    image_width=width, updated_at=timezone.now()
+                )
+                if count:
+                    self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Изображений: {len(names)}, создано копий: {created}, '
+            f'ошибок: {failed}.'
+        ))
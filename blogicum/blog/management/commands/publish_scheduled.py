@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Включает в ленты отложенные посты, дата публикации которых '
+        'наступила. Посты сохраняются через save(), поэтому срабатывают '
+        'те же сигналы (сброс кэшей, поисковый индекс), что и при '
+        'редактировании. С --loop работает постоянно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Наибольшая пауза между проверками в режиме --loop, секунд.',
+        )
+
+    def publish_due(self):
+        published = 0
+        post_ids = list(
+            Post.objects.due().order_by('pub_date', 'id').values_list(
+                'pk', flat=True
+            )
+        )
+        for pk in post_ids:
+            with transaction.atomic():
+                # Условный UPDATE заново проверяет дату под блокировкой
+                # записи: пост, дату которого успели перенести, не
+                # публикуется раньше срока
+                if not Post.objects.due().filter(pk=pk).update(is_live=True):
+                    continue
+                # Сохранение свежей копии отправляет те же сигналы, что
+                # и правка поста
+                post = Post.objects.select_related('category').get(pk=pk)
+                post.save(update_fields=('is_live',))
+            published += 1
+            self.stdout.write(f'Опубликован пост {post.pk}: {post}')
+        return published
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            published = self.publish_due()
+            self.stdout.write(
+                self.style.SUCCESS(f'Опубликовано постов: {published}.')
+            )
+            return
+
+        while True:
+            self.publish_due()
+            # Сон до ближайшей отложенной публикации, но не дольше
+            # --interval: новые отложенные посты появляются в любой момент
+            pause = options['interval']
+            next_pub_date = Post.objects.next_pub_date()
+            if next_pub_date is not None:
+                until = (next_pub_date - timezone.now()).total_seconds()
+                pause = max(min(pause, until), 0)
+            close_old_connections()
+            time.sleep(pause)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog import feeds, page_cache, profile_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает материализованные ленты категорий и авторов '
+        'по текущим постам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько постов читать и добавлять за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        added = feeds.rebuild(options['batch_size'])
+        page_cache.invalidate_public_pages()
+        profile_cache.invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Ленты перестроены: постов в лентах {added}.')
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс постов, читая посты потоком '
+        'пачками по --chunk-size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько постов читать и индексировать за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        if isinstance(backend, search.MemoryBackend):
+            self.stdout.write(self.style.WARNING(
+                'Индекс в памяти строится каждым процессом при первом '
+                'поиске; команда только проверяет, что он собирается.'
+            ))
+        else:
+            backend.create_table()
+        indexed = 0
+        # Одна транзакция: пока индекс перестраивается, поиск работает
+        # по прежнему индексу, а не по пустому или неполному
+        with transaction.atomic():
+            backend.clear()
+            for posts in search.iter_post_chunks(options['chunk_size']):
+                backend.index_posts(posts)
+                indexed += len(posts)
+                self.stdout.write(f'Проиндексировано постов: {indexed}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Индекс ({type(backend).__name__}) перестроен: {indexed}.'
+            )
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import fragments, page_cache, profile_cache
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает comments_count и last_commented_at у постов '
+        'по таблице комментариев, обрабатывая посты диапазонами id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько постов обновлять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        last_id = last_id.first()
+        if last_id is None:
+            self.stdout.write('Постов нет.')
+            return
+
+        updated = 0
+        # Диапазоны по первичному ключу: каждая пачка — один UPDATE
+        for start in range(0, last_id + 1, batch_size):
+            with transaction.atomic():
+                updated += Post.objects.filter(
+                    pk__gte=start, pk__lt=start + batch_size
+                ).recount_comments()
+        # UPDATE не отправляет сигналы, поэтому кэши сбрасываются вручную
+        fragments.invalidate_all()
+        page_cache.invalidate_public_pages()
+        profile_cache.invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны счётчики у {updated} постов.')
+        )
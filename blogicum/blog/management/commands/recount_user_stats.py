@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает posts_count и comments_count у пользователей '
+        'по таблицам постов и комментариев, обрабатывая пользователей '
+        'диапазонами id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько пользователей обновлять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = User.objects.order_by('-pk').values_list('pk', flat=True)
+        last_id = last_id.first()
+        if last_id is None:
+            self.stdout.write('Пользователей нет.')
+            return
+
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            users = User.objects.filter(
+                pk__gte=start, pk__lt=start + batch_size
+            )
+            with transaction.atomic():
+                updated += users.recount_posts()
+                users.recount_comments()
+        # Шапка профиля не входит в кэш ленты, сбрасывать нечего
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Пересчитаны счётчики у {updated} пользователей.'
+            )
+        )
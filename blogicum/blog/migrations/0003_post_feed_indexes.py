@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-pub_date', '-id'), 'verbose_name': 'публикация', 'verbose_name_plural': 'Публикации'},
+        ),
+        # Частичные индексы лент главной и категорий создаются вместе
+        # с флагом is_live (0010_post_is_live)
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_feed_idx'),
+        ),
+    ]
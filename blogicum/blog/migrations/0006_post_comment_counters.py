@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:36
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counters(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    comments = Comment.objects.filter(post=models.OuterRef('pk')).order_by()
+    Post.objects.update(
+        comments_count=Coalesce(
+            models.Subquery(
+                comments.values('post')
+                .annotate(total=models.Count('pk'))
+                .values('total')
+            ),
+            0,
+        ),
+        last_commented_at=models.Subquery(
+            comments.order_by('-created_at').values('created_at')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='last_commented_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний комментарий'),
+        ),
+        migrations.RunPython(fill_comment_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:45
+
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # Виртуальная таблица FTS5 создаётся только там, где она поддерживается;
+    # иначе поиск работает через индекс в памяти (blog.search.MemoryBackend)
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        if ('ENABLE_FTS5',) not in cursor.fetchall():
+            return
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            "USING fts5(title, text, tokenize='unicode61')"
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_comment_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_comment_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_ready',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Фото обработано'),
+        ),
+    ]
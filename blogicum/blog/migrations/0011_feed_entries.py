@@ -0,0 +1,74 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+CHUNK_SIZE = 2000
+
+
+def fill_feed_entries(apps, schema_editor):
+    # Посты читаются пачками по первичному ключу, а не все сразу
+    Post = apps.get_model('blog', 'Post')
+    CategoryFeedEntry = apps.get_model('blog', 'CategoryFeedEntry')
+    AuthorFeedEntry = apps.get_model('blog', 'AuthorFeedEntry')
+    posts = (
+        Post.objects.filter(is_live=True, category__is_published=True)
+        .order_by('pk')
+        .values_list('pk', 'category_id', 'author_id', 'pub_date')
+    )
+    last_pk = 0
+    while rows := list(posts.filter(pk__gt=last_pk)[:CHUNK_SIZE]):
+        CategoryFeedEntry.objects.bulk_create(
+            CategoryFeedEntry(
+                post_id=pk, category_id=category_id, pub_date=date
+            )
+            for pk, category_id, _, date in rows
+        )
+        AuthorFeedEntry.objects.bulk_create(
+            AuthorFeedEntry(post_id=pk, author_id=author_id, pub_date=date)
+            for pk, _, author_id, date in rows
+        )
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0010_post_is_live'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryFeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='category_feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='blog.category')),
+            ],
+            options={
+                'ordering': ('-pub_date', '-post_id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorFeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-pub_date', '-post_id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='categoryfeedentry',
+            index=models.Index(fields=['category', '-pub_date', '-post'], name='category_feed_entry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='authorfeedentry',
+            index=models.Index(fields=['author', '-pub_date', '-post'], name='author_feed_entry_idx'),
+        ),
+        migrations.RunPython(fill_feed_entries, migrations.RunPython.noop),
+    ]
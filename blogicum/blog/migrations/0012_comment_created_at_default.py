@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-17 17:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_feed_entries'),
+    ]
+
+    # Столбец в базе не меняется: auto_now_add и default различаются
+    # только в Python, поэтому таблица комментариев не пересоздаётся
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='comment',
+                    name='created_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+    ]
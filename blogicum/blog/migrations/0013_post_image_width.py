@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_comment_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from core.models import PublishedModel
 
@@ -42,6 +44,89 @@ class Location(PublishedModel):
     def __str__(self):
         return self.name
 
+
+# Условие видимости поста для всех посетителей. Наступление даты
+# публикации хранится во флаге is_live, поэтому условие не зависит
+# от текущего времени
+def published_filter():
+    return models.Q(is_live=True, category__is_published=True)
+
+
+# Набор запросов для постов: общие фильтры и оптимизации для лент
+class PostQuerySet(models.QuerySet):
+    # Посты, видимые всем: опубликованы, категория опубликована, дата наступила
+    def published(self):
+        return self.filter(published_filter())
+
+    # Отложенные посты, дата публикации которых уже наступила
+    def due(self):
+        return self.filter(
+            is_published=True, is_live=False, pub_date__lte=timezone.now()
+        )
+
+    # Ближайшая ещё не наступившая дата отложенной публикации
+    def next_pub_date(self):
+        return self.filter(
+            is_published=True, is_live=False, pub_date__gt=timezone.now()
+        ).aggregate(next_pub_date=models.Min('pub_date'))['next_pub_date']
+
+    # Посты, которые может открыть пользователь: опубликованные и свои
+    def visible_to(self, user):
+        if user.is_authenticated:
+            return self.filter(published_filter() | models.Q(author=user))
+        return self.published()
+
+    # Подгрузка связанных объектов одним JOIN вместо запроса на каждую карточку
+    def with_related(self):
+        return self.select_related('author', 'location', 'category')
+
+    # Готовый набор для карточек в лентах: категории и местоположения
+    # карточки берут из справочников blog.lookups
+    def for_feed(self):
+        return self.select_related('author')
+
+    # Учёт новых комментариев в денормализованных полях поста
+    def comment_added(self, created_at, count=1):
+        # Комментарий из журнала может оказаться старше уже записанных
+        date = models.Value(created_at, output_field=models.DateTimeField())
+        return self.update(
+            comments_count=models.F('comments_count') + count,
+            last_commented_at=Coalesce(
+                Greatest('last_commented_at', date), date
+            ),
+        )
+
+    # Учёт удалённого комментария: время последнего берётся из оставшихся
+    def comment_removed(self):
+        return self.update(
+            comments_count=models.F('comments_count') - 1,
+            last_commented_at=models.Subquery(latest_comment_dates()),
+        )
+
+    # Пересчёт счётчиков по таблице комментариев (исправление расхождений)
+    def recount_comments(self):
+        totals = (
+            Comment.objects.filter(post=models.OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=models.Count('pk'))
+            .values('total')
+        )
+        return self.update(
+            comments_count=Coalesce(models.Subquery(totals), 0),
+            last_commented_at=models.Subquery(latest_comment_dates()),
+        )
+
+
+# Подзапрос: время самого нового комментария поста
+def latest_comment_dates():
+    return (
+        Comment.objects.filter(post=models.OuterRef('pk'))
+        .order_by('-created_at')
+        .values('created_at')[:1]
+    )
+
+
 # Модель поста, наследует от PublishedModel
 class Post(PublishedModel):
     # Заголовок поста (максимальная длина — 256 символов)
@@ -50,12 +135,26 @@ class Post(PublishedModel):
     text = models.TextField(verbose_name='Текст')
     # Фото поста (не обязательное поле, используется для загрузки изображений)
     image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    # Снимается при загрузке нового фото, пока фоновая задача его обрабатывает
+    image_ready = models.BooleanField(
+        default=True, editable=False, verbose_name='Фото обработано'
+    )
+    # Ширина оригинала: по ней тег responsive_image строит наборы копий
+    # без проверки файлов в хранилище. Заполняет фоновая задача
+    image_width = models.PositiveIntegerField(
+        null=True, editable=False, verbose_name='Ширина фото'
+    )
     # Дата и время публикации
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
                   'можно делать отложенные публикации.',
     )
+    # Пост опубликован и его дата наступила. Пересчитывается при каждом
+    # сохранении; отложенные посты включает команда publish_scheduled
+    is_live = models.BooleanField(
+        default=False, editable=False, verbose_name='В ленте'
+    )
     # Автор публикации (внешний ключ к модели User, удаление записи приводит к удалению постов)
     author = models.ForeignKey(
         User,
@@ -80,19 +179,65 @@ class Post(PublishedModel):
         verbose_name='Категория',
         related_name='posts',
     )
+    # Время последнего изменения (версия поста для кэша карточек)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
+    # Денормализованные данные о комментариях, обновляются сигналами при их
+    # добавлении и удалении; расхождения исправляет команда recount_comments
+    comments_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Комментариев'
+    )
+    last_commented_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Последний комментарий',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
-        ordering = ('-pub_date',)
+        # id разрешает совпадения дат и служит вторым ключом курсора
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            # Лента главной страницы: посты в ленте по убыванию даты
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+                condition=models.Q(is_live=True),
+            ),
+            # Лента категории
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_live=True),
+            ),
+            # Страница автора: владелец видит все свои посты
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     # Метод для получения абсолютного URL поста (используется для перенаправлений)
     def get_absolute_url(self):
         return reverse('blog:profile', args=[self.author])
 
-    # Метод для подсчета количества комментариев
+    def save(self, *args, **kwargs):
+        self.is_live = bool(
+            self.is_published
+            and self.pub_date
+            and self.pub_date <= timezone.now()
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_live'}
+        super().save(*args, **kwargs)
+
+    # Количество комментариев из денормализованного поля, без запроса
     def comment_count(self):
-        return self.comments.count()
+        return self.comments_count
 
     def __str__(self):
         return self.title
@@ -109,8 +254,9 @@ class Comment(models.Model):
         verbose_name='Пост',
         help_text='Выберите пост, к которому относится комментарий',
     )
-    # Время создания комментария
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Время создания комментария; очередь комментариев (comment_buffer)
+    # передаёт время приёма, а не записи в базу
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     # Автор комментария (внешний ключ к модели User)
     author = models.ForeignKey(
         User,
@@ -119,13 +265,74 @@ class Comment(models.Model):
     )
 
     class Meta:
-        ordering = ('created_at',)
+        ordering = ('created_at', 'id')
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            # Комментарии поста по порядку: ключ курсорной пагинации
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_order_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
 
+
+# Материализованные ленты: заранее упорядоченные видимые посты категории
+# и автора. Страница ленты — один проход по диапазону индекса таблицы.
+# Записи поддерживают сигналы (blog.feeds), перестраивает команда
+# rebuild_feeds
+class CategoryFeedEntry(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='category_feed_entry',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(
+                fields=('category', '-pub_date', '-post'),
+                name='category_feed_entry_idx',
+            ),
+        )
+
+
+class AuthorFeedEntry(models.Model):
+    # Лента автора для посетителей; владелец видит все свои посты
+    # через индекс post_author_feed_idx
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='author_feed_entry',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(
+                fields=('author', '-pub_date', '-post'),
+                name='author_feed_entry_idx',
+            ),
+        )
+
 # Модель профиля пользователя, также наследует от PublishedModel
 class Profile(PublishedModel):
     # Имя пользователя
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from core.metrics import record_cache
+
+# Поколение кэша страниц: смена значения делает недействительными все записи
+GENERATION_KEY = 'public_page:generation'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_public_pages():
+    # Новое поколение публикуется после коммита, иначе параллельный запрос
+    # успел бы закэшировать ещё не изменённую страницу под ним
+    transaction.on_commit(
+        lambda: cache.set(GENERATION_KEY, time.time_ns(), None)
+    )
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'public_page:{get_generation()}:{path}'
+
+
+def is_cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def store(key, response):
+    entry = {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+    # Отложенные посты попадают в ленты через сохранение (publish_scheduled),
+    # которое сбрасывает кэш сигналом; поколение лежит в общем кэше
+    # (CACHES), поэтому сброс из процесса планировщика видят все процессы
+    # сайта и срок жизни постоянный
+    cache.set(key, entry, settings.PUBLIC_PAGE_CACHE_TIMEOUT)
+    return entry
+
+
+def respond(request, entry, response=None):
+    if response is None:
+        response = HttpResponse(
+            entry['content'], content_type=entry['content_type']
+        )
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=entry['last_modified'],
+        response=response,
+    )
+
+
+def cache_public_page(view):
+    # Кэш целых страниц для анонимных посетителей с ETag/Last-Modified;
+    # авторизованные пользователи всегда получают свежую страницу.
+    # Подходит и для обычных, и для асинхронных представлений
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not await sync_to_async(is_cacheable)(request):
+                return await view(request, *args, **kwargs)
+            key = await sync_to_async(page_key)(request)
+            entry = await sync_to_async(cache.get)(key)
+            record_cache(hit=entry is not None)
+            if entry is not None:
+                return respond(request, entry)
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            entry = await sync_to_async(store)(key, response)
+            return respond(request, entry, response)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        key = page_key(request)
+        entry = cache.get(key)
+        record_cache(hit=entry is not None)
+        if entry is not None:
+            return respond(request, entry)
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+            return response
+        return respond(request, store(key, response), response)
+
+    return wrapper
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Направления перехода, зашитые в курсор
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    # Страница курсорной пагинации: повторяет интерфейс Page,
+    # который используют шаблоны, но не знает номера и общего числа страниц
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    # Пагинация по ключу (keyset): вместо COUNT(*) и OFFSET страница
+    # начинается сразу за последней записью предыдущей страницы
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name in self.fields]
+        # str() сохраняет микросекунды дат, в отличие от DjangoJSONEncoder
+        raw = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (FORWARD, BACKWARD):
+                raise InvalidCursor(cursor)
+            if not isinstance(values, list) or (
+                len(values) != len(self.fields)
+            ):
+                raise InvalidCursor(cursor)
+            opts = self.queryset.model._meta
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise InvalidCursor(cursor)
+        # to_python пропускает None, а сравнение с NULL в keyset_filter
+        # невозможно: ключи курсора всегда заполнены
+        if any(value is None for value in values):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def keyset_filter(self, values, backward):
+        # (a, b) < (x, y) раскрывается в a < x OR (a = x AND b < y).
+        # По такому OR SQLite не строит диапазон индекса и просматривает
+        # его с начала, поэтому впереди добавлена граница a <= x
+        condition = Q()
+        equal = {}
+        for name, field, value in zip(self.ordering, self.fields, values):
+            lookup = self.lookup(name, backward)
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        bound = f'{self.fields[0]}__{self.lookup(self.ordering[0], backward)}e'
+        return Q(**{bound: values[0]}) & condition
+
+    @staticmethod
+    def lookup(name, backward):
+        descending = name.startswith('-')
+        return 'gt' if descending == backward else 'lt'
+
+    def reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def get_page(self, cursor=None):
+        # Некорректный курсор ведёт на первую страницу, как и в Paginator
+        direction, values = FORWARD, None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                pass
+        backward = direction == BACKWARD
+
+        queryset = self.queryset.order_by(
+            *(self.reversed_ordering() if backward else self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, backward))
+        # Лишняя запись показывает, есть ли что-то за границей страницы
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backward:
+            if not has_more:
+                # Дошли до начала ленты: отдаём полную первую страницу
+                return self.get_page()
+            rows.reverse()
+            has_next, has_previous = True, True
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1], FORWARD)
+                if has_next and rows else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], BACKWARD)
+                if has_previous and rows else None
+            ),
+        )
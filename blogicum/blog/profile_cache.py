@@ -0,0 +1,69 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.metrics import record_cache
+
+# Кэш ленты профиля для посетителей: у каждого автора своя версия,
+# смена которой делает недействительными все страницы его профиля.
+# Версии живут внутри поколения, смена поколения сбрасывает все профили
+GENERATION_KEY = 'profile_page:generation'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_all():
+    # Как и версии профилей, поколение меняется после коммита
+    transaction.on_commit(
+        lambda: cache.set(GENERATION_KEY, time.time_ns(), None)
+    )
+
+
+def version_key(user_id):
+    return f'profile_page:{get_generation()}:{user_id}:version'
+
+
+def get_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.set(key, version, None)
+    return version
+
+
+def page_key(user_id, request):
+    # Номер страницы или курсор входят в ключ вместе со всей строкой запроса
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return f'profile_page:{user_id}:{get_version(user_id)}:{query}'
+
+
+def get(key):
+    content = cache.get(key)
+    record_cache(hit=content is not None)
+    return content
+
+
+def store(key, content):
+    cache.set(key, content, settings.PROFILE_PAGE_CACHE_TIMEOUT)
+
+
+def invalidate_profiles(user_ids):
+    # Версии меняются после коммита, иначе параллельный запрос успел бы
+    # закэшировать ещё не изменённые данные под новой версией
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        {version_key(user_id): time.time_ns() for user_id in user_ids},
+        None,
+    ))
@@ -0,0 +1,261 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models.expressions import RawSQL
+
+# Заголовок весит больше текста при ранжировании BM25
+TITLE_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(value):
+    return WORD_RE.findall(value.lower())
+
+
+def match_expression(query):
+    # Каждое слово запроса берётся в кавычки, чтобы пользовательский
+    # ввод не разбирался как синтаксис FTS5; слова объединяются через AND
+    return ' '.join(f'"{word}"' for word in tokenize(query))
+
+
+class SQLiteFTSBackend:
+    # Индекс в виртуальной таблице SQLite FTS5; rowid совпадает с id поста
+    table = 'blog_post_fts'
+
+    @staticmethod
+    def is_supported(conn=connection):
+        if conn.vendor != 'sqlite':
+            return False
+        with conn.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            return ('ENABLE_FTS5',) in cursor.fetchall()
+
+    def create_table(self, conn=connection):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} '
+                "USING fts5(title, text, tokenize='unicode61')"
+            )
+
+    def index_posts(self, posts, conn=connection):
+        rows = [(post.pk, post.title, post.text) for post in posts]
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                rows,
+            )
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(post_id,) for post_id in post_ids],
+            )
+
+    def clear(self, conn=connection):
+        with conn.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, query, limit):
+        match = match_expression(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, %s, %s) LIMIT %s',
+                [match, TITLE_WEIGHT, TEXT_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter_posts(self, queryset, query):
+        # Все совпадения без ранжирования и ограничения числа, одним
+        # подзапросом (поиск в админке)
+        match = match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match],
+        ))
+
+
+class MemoryBackend:
+    # Инвертированный индекс в памяти процесса для баз без FTS5.
+    # Строится при первом поиске. Изменения постов меняют версию индекса
+    # в общем кэше, и каждый процесс, заметивший новую версию, строит
+    # индекс заново: сигналы обновляют только индекс своего процесса
+    k1 = 1.2
+    b = 0.75
+    version_key = 'search:memory:version'
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.terms = {}
+        self.version = None
+        self._lock = threading.RLock()
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            version = time.time_ns()
+            cache.set(self.version_key, version, None)
+        return version
+
+    def changed(self):
+        # Новая версия публикуется после коммита, иначе другой процесс
+        # успел бы перестроить индекс без изменений
+        transaction.on_commit(
+            lambda: cache.set(self.version_key, time.time_ns(), None)
+        )
+
+    def _frequencies(self, post):
+        frequencies = Counter()
+        for word in tokenize(post.title):
+            frequencies[word] += TITLE_WEIGHT
+        for word in tokenize(post.text):
+            frequencies[word] += TEXT_WEIGHT
+        return frequencies
+
+    def _remove(self, post_id):
+        for term in self.terms.pop(post_id, ()):
+            self.postings[term].pop(post_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+        self.lengths.pop(post_id, None)
+
+    def index_posts(self, posts):
+        self._index(posts)
+        self.changed()
+
+    def _index(self, posts):
+        with self._lock:
+            for post in posts:
+                self._remove(post.pk)
+                frequencies = self._frequencies(post)
+                for term, frequency in frequencies.items():
+                    self.postings[term][post.pk] = frequency
+                self.terms[post.pk] = tuple(frequencies)
+                self.lengths[post.pk] = sum(frequencies.values())
+
+    def remove_posts(self, post_ids):
+        with self._lock:
+            for post_id in post_ids:
+                self._remove(post_id)
+        self.changed()
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.lengths.clear()
+            self.terms.clear()
+            self.version = None
+
+    def load(self):
+        version = self.get_version()
+        with self._lock:
+            if version != self.version:
+                self.clear()
+                for posts in iter_post_chunks():
+                    self._index(posts)
+                self.version = version
+
+    def search(self, query, limit):
+        self.load()
+        words = set(tokenize(query))
+        with self._lock:
+            if not words or not self.lengths:
+                return []
+            # Как и в FTS5, документ должен содержать все слова запроса
+            candidates = None
+            for word in words:
+                found = set(self.postings.get(word, ()))
+                candidates = (
+                    found if candidates is None else candidates & found
+                )
+            total = len(self.lengths)
+            average = sum(self.lengths.values()) / total
+            scores = {}
+            for post_id in candidates:
+                length = self.lengths[post_id]
+                score = 0.0
+                for word in words:
+                    postings = self.postings[word]
+                    idf = math.log(
+                        (total - len(postings) + 0.5) / (len(postings) + 0.5)
+                        + 1
+                    )
+                    frequency = postings[post_id]
+                    score += idf * frequency * (self.k1 + 1) / (
+                        frequency
+                        + self.k1 * (1 - self.b + self.b * length / average)
+                    )
+                scores[post_id] = score
+        ranked = sorted(
+            scores, key=lambda post_id: (-scores[post_id], -post_id)
+        )
+        return ranked[:limit]
+
+    def filter_posts(self, queryset, query):
+        return queryset.filter(pk__in=self.search(query, None))
+
+
+def iter_post_chunks(chunk_size=2000, using=DEFAULT_DB_ALIAS):
+    # Посты читаются потоком, пачками по chunk_size, без загрузки всей таблицы
+    from blog.models import Post
+
+    chunk = []
+    posts = (
+        Post.objects.using(using)
+        .only('pk', 'title', 'text')
+        .order_by('pk')
+    )
+    for post in posts.iterator(chunk_size=chunk_size):
+        chunk.append(post)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    # SEARCH_BACKEND = 'fts5' использует SQLite FTS5, если база его
+    # поддерживает, иначе (и при 'memory') — индекс в памяти процесса
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if (
+                    settings.SEARCH_BACKEND == 'fts5'
+                    and SQLiteFTSBackend.is_supported()
+                ):
+                    _backend = SQLiteFTSBackend()
+                else:
+                    _backend = MemoryBackend()
+    return _backend
+
+
+def search_post_ids(query, limit=None):
+    return get_backend().search(query, limit or settings.SEARCH_MAX_RESULTS)
+
+
+def filter_posts(queryset, query):
+    return get_backend().filter_posts(queryset, query)
@@ -0,0 +1,251 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog import (
+    feeds,
+    fragments,
+    images,
+    lookups,
+    page_cache,
+    profile_cache,
+    search,
+)
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+
+def authors_of(posts):
+    return set(
+        posts.order_by().values_list('author_id', flat=True).distinct()
+    )
+
+
+def publication_changed(category):
+    # Флаг публикации категории до сохранения запоминает
+    # remember_category_state; у новой категории постов ещё нет
+    previous = getattr(category, '_was_published', None)
+    return previous is not None and previous != category.is_published
+
+
+# Снятие категории с публикации и её возврат меняют ленты и счётчики
+# авторов; правка заголовка или описания их не трогает
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    instance._was_published = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list('is_published', flat=True)
+        .first()
+    )
+
+
+# Изменение поста сбрасывает только его карточку
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, **kwargs):
+    fragments.invalidate_post(instance.pk)
+
+
+# Комментарии меняют счётчик на карточке поста
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post_card(sender, instance, **kwargs):
+    fragments.invalidate_post(instance.post_id)
+
+
+# Категория или местоположение могут встречаться на любом числе карточек,
+# поэтому сбрасывается всё поколение кэша
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_post_cards(sender, instance, **kwargs):
+    fragments.invalidate_all()
+
+
+# Справочники категорий и местоположений в памяти процессов
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_lookup(sender, instance, **kwargs):
+    lookups.categories.invalidate()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_lookup(sender, instance, **kwargs):
+    lookups.locations.invalidate()
+
+
+# Страницы лент для анонимных посетителей зависят от постов, категорий
+# и местоположений; счётчики комментариев обновляются по истечении TTL
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_public_pages(sender, instance, **kwargs):
+    page_cache.invalidate_public_pages()
+
+
+# Поисковый индекс обновляется при каждом изменении поста
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.get_backend().index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove_posts([instance.pk])
+
+
+# Материализованные ленты категорий и авторов. Местоположение на
+# видимость поста не влияет: оно подгружается вместе с постом
+@receiver(post_save, sender=Post)
+def sync_post_feeds(sender, instance, **kwargs):
+    feeds.sync_post(instance)
+
+
+@receiver(post_save, sender=Category)
+def sync_category_feeds(sender, instance, **kwargs):
+    if publication_changed(instance):
+        feeds.sync_category(instance)
+
+
+# Посты удалённой категории остаются без неё (SET_NULL обходит сигналы)
+# и пропадают из лент авторов; записи ленты категории удалит каскад
+@receiver(pre_delete, sender=Category)
+def remove_category_feeds(sender, instance, **kwargs):
+    feeds.remove_posts(Post.objects.filter(category=instance).values('pk'))
+
+
+# Ленты профилей для посетителей. Пост меняет ленту своего автора
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_author_profile(sender, instance, **kwargs):
+    profile_cache.invalidate_profiles([instance.author_id])
+
+
+# Карточки в ленте автора показывают число комментариев его постов;
+# правка текста комментария число не меняет
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_author_profile(sender, instance, created=True,
+                                        **kwargs):
+    if created:
+        profile_cache.invalidate_profiles(
+            Post.objects.filter(pk=instance.post_id)
+            .values_list('author_id', flat=True)
+        )
+
+
+# Категория или местоположение — ленты авторов, у которых есть посты
+# с ними; при удалении авторы находятся до того, как SET_NULL отвяжет посты
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_profiles(sender, instance, **kwargs):
+    profile_cache.invalidate_profiles(authors_of(instance.posts.all()))
+
+
+# Имя пользователя выводится на карточках его постов: версия профиля
+# входит в версию карточки (blog.fragments). Под комментариями оно
+# выводится на страницах чужих постов: их отметка изменения обновляется,
+# чтобы сменился ETag (blog.conditional). Вход в систему меняет только
+# last_login и ничего не сбрасывает
+@receiver(post_save, sender=User)
+def invalidate_user_profile(sender, instance, created, update_fields=None,
+                            **kwargs):
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    profile_cache.invalidate_profiles([instance.pk])
+    Post.objects.filter(
+        pk__in=Comment.objects.filter(author=instance).values('post_id')
+    ).update(updated_at=timezone.now())
+
+
+# Счётчики в шапке профиля. Видимость поста зависит от нескольких полей,
+# поэтому число опубликованных постов автора пересчитывается целиком
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def recount_author_posts(sender, instance, **kwargs):
+    User.objects.filter(pk=instance.author_id).recount_posts()
+
+
+# Снятие категории с публикации или её удаление меняет число
+# опубликованных постов у её авторов; пересчёт идёт после коммита,
+# когда посты удалённой категории уже отвязаны
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def recount_category_authors(sender, instance, signal, **kwargs):
+    if signal is post_save and not publication_changed(instance):
+        return
+    author_ids = authors_of(instance.posts.all())
+    if author_ids:
+        transaction.on_commit(
+            lambda: User.objects.filter(pk__in=author_ids).recount_posts()
+        )
+
+
+# Счётчики комментариев поста и автора. Сигналы срабатывают и при
+# правках в админке, и при каскадном удалении вместе с пользователем;
+# bulk_create их не отправляет, поэтому comment_buffer.write_batch
+# обновляет счётчики сам
+@receiver(post_save, sender=Comment)
+def count_added_comment(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).comment_added(
+            instance.created_at
+        )
+        User.objects.filter(pk=instance.author_id).comment_added()
+
+
+@receiver(post_delete, sender=Comment)
+def count_removed_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).comment_removed()
+    User.objects.filter(pk=instance.author_id).comment_removed()
+
+
+# Правка комментария меняет страницу поста, но не его счётчики: отметка
+# изменения поста обновляется, чтобы сменился ETag страницы
+# (blog.conditional)
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, **kwargs):
+    if not created:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now()
+        )
+
+
+# Уменьшенные копии заменённого изображения удаляются после коммита;
+# имя прежнего файла запоминается до сохранения, если поле image
+# может измениться
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+def remember_image(sender, instance, update_fields=None, **kwargs):
+    adding = instance._state.adding
+    if adding or update_fields is not None and 'image' not in update_fields:
+        instance._previous_image = None
+        return
+    instance._previous_image = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list('image', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def delete_replaced_derivatives(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_image', None)
+    if previous and previous != instance.image.name:
+        transaction.on_commit(lambda: images.delete_derivatives(previous))
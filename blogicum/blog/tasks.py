@@ -0,0 +1,67 @@
+import logging
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+
+from blog import images
+from core import jobs
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_image_processing(instance):
+    # Обработка загруженного изображения откладывается в очередь задач;
+    # у поста до её окончания вместо картинки показывается заглушка
+    jobs.enqueue(
+        'blog.process_image',
+        model=instance._meta.model_name,
+        pk=instance.pk,
+        image=instance.image.name,
+    )
+
+
+@jobs.register('blog.process_image')
+def process_image(model, pk, image):
+    model = apps.get_model('blog', model)
+    queryset = model.objects.filter(pk=pk)
+    # Категория поста нужна сигналу лент (blog.feeds.sync_post)
+    if hasattr(model, 'category'):
+        queryset = queryset.select_related('category')
+    instance = queryset.first()
+    # Объект удалён или изображение уже заменено другим
+    if instance is None or instance.image.name != image:
+        return
+    # Файл удаляется, только если это не изображение, «бомба распаковки»
+    # или битый файл; остальные ошибки (хранилище, база) уходят в очередь
+    # задач, и задача повторяется
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        images.validate_image(image)
+    except (
+        UnidentifiedImageError,
+        Image.DecompressionBombError,
+        ValidationError,
+    ):
+        logger.warning('Файл %s не является изображением и удалён', image)
+        default_storage.delete(image)
+        instance.image = ''
+        width = None
+    else:
+        instance.image.name = images.strip_exif(image)
+        images.generate_derivatives(instance.image.name)
+        width = images.get_width(instance.image.name)
+    update_fields = ['image']
+    if hasattr(instance, 'image_ready'):
+        instance.image_ready = True
+        update_fields.append('image_ready')
+    if hasattr(instance, 'image_width'):
+        instance.image_width = width
+        update_fields.append('image_width')
+    # Новая отметка изменения меняет версию карточки поста: локальные
+    # кэши карточек в процессах сайта иначе так и показывали бы заглушку
+    if hasattr(instance, 'updated_at'):
+        update_fields.append('updated_at')
+    # Обычное сохранение, чтобы сигналы сбросили кэши карточек и страниц
+    instance.save(update_fields=update_fields)
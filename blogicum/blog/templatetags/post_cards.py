@@ -0,0 +1,12 @@
+from django import template
+
+from blog.fragments import render_post_card
+
+register = template.Library()
+
+
+# Карточка поста из кэша фрагментов вместо
+# {% include "includes/post_card.html" %}
+@register.simple_tag
+def post_card(post):
+    return render_post_card(post)
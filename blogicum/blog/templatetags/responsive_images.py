@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html
+
+from blog.images import FORMATS, get_srcset
+
+register = template.Library()
+
+
+# <picture> с наборами уменьшенных копий в WebP и JPEG; пока копий нет,
+# выводится оригинал. Готовность копий и их ширины берутся из полей
+# модели (image_ready, image_width), а не из хранилища
+@register.simple_tag
+def responsive_image(image, sizes='100vw', css_class=''):
+    instance = image.instance
+    width = getattr(instance, 'image_width', None)
+    if not (getattr(instance, 'image_ready', False) and width):
+        return format_html(
+            '<img class="{}" src="{}" alt="">', css_class, image.url
+        )
+    sources = {
+        extension: get_srcset(image.name, width, extension)
+        for extension, _ in FORMATS
+    }
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" alt="">'
+        '</picture>',
+        sources['webp'],
+        sizes,
+        css_class,
+        image.url,
+        sources['jpg'],
+        sizes,
+    )
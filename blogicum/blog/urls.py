@@ -1,22 +1,29 @@
+from django.conf import settings
 from django.urls import path, re_path
-from blog import views
+from blog import async_views, views
 
 app_name = 'blog'
 
+# Публичные страницы на чтение можно переключить на асинхронные версии
+feed_views = async_views if settings.BLOG_ASYNC_VIEWS else views
+
 
 urlpatterns = [
     # Главная страница (список всех постов)
-    path('', views.index, name='index'),
+    path('', feed_views.index, name='index'),
 
     # Страница с постами по категории
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        feed_views.category_posts,
         name='category_posts',
     ),
 
+    # Поиск по публикациям
+    path('search/', views.search, name='search'),
+
     # Профиль пользователя
-    path('profile/<username>/', views.profile_view, name='profile'),
+    path('profile/<username>/', feed_views.profile_view, name='profile'),
 
     # Страница редактирования профиля (разрешены символы в username, включая кириллицу)
     re_path(r'^profile/(?P<username>[\w-]+)/edit_profile/$', views.ProfileUpdateView.as_view(), name='edit_profile'),
@@ -27,10 +34,17 @@ urlpatterns = [
     # Страница детального просмотра поста
     path(
         'posts/<int:post_id>/',
-        views.PostDetailView.as_view(),
+        feed_views.PostDetailView.as_view(),
         name='post_detail',
     ),
 
+    # Фрагмент со следующей порцией комментариев к посту
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments',
+    ),
+
     # Страница для редактирования поста
     path(
         'posts/<int:post_id>/edit/',
@@ -1,49 +1,95 @@
-from django.utils import timezone
+import math
+
 from django.views.generic import (
     CreateView,
     UpdateView,
     DetailView,
 )
+from django.conf import settings
 from django.urls import reverse_lazy
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth import get_user_model
-from django.http import Http404
-from django.http import HttpResponseForbidden
-
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+
+from blog import comment_buffer, profile_cache
+from blog.conditional import conditional_post_page
+from blog.feeds import FEED_ORDERING
 from blog.forms import PostForm, CommentForm, ProfileForm, PasswordChangeForm
-from blog.models import Post, Category, Comment
+from blog.lookups import get_published_category
+from blog.models import Post, Comment
+from blog.page_cache import cache_public_page
+from blog.paginators import CursorPaginator
+from blog.search import search_post_ids
+from blog.tasks import schedule_image_processing
+from core.db_router import read_from_replica
+from core.ratelimit import RateLimited
+from core.sqlite import retry_on_lock
 
 
 User = get_user_model()  # Получаем модель пользователя
 LIMIT_POSTS = 3  # Лимит на количество постов на странице
+LIMIT_COMMENTS = 20  # Размер порции комментариев на странице поста
+
+
+def get_page_obj(request, posts, ordering=("-pub_date", "-id")):
+    # Курсорный режим включается настройкой POSTS_PAGINATION;
+    # старые ссылки вида ?page=N всегда обслуживает нумерованный пагинатор
+    if settings.POSTS_PAGINATION == "cursor" and "page" not in request.GET:
+        paginator = CursorPaginator(posts, LIMIT_POSTS, ordering)
+        return paginator.get_page(request.GET.get("cursor"))
+    paginator = Paginator(posts, LIMIT_POSTS)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    # Сокращённый список номеров вместо полного page_range
+    page_obj.elided_page_range = paginator.get_elided_page_range(
+        page_obj.number
+    )
+    return page_obj
+
+
+def get_feed_page(request, entries):
+    # Страница материализованной ленты: диапазон индекса её таблицы,
+    # посты с авторами приходят тем же запросом
+    entries = entries.select_related("post__author")
+    page_obj = get_page_obj(request, entries, FEED_ORDERING)
+    page_obj.object_list = [entry.post for entry in page_obj.object_list]
+    return page_obj
+
+
+def get_profile_feed(request, user):
+    # Лента автора для посетителей одинакова у всех, поэтому её HTML
+    # кэшируется по автору и строке запроса
+    key = profile_cache.page_key(user.pk, request)
+    content = profile_cache.get(key)
+    if content is None:
+        page_obj = get_feed_page(request, user.feed_entries.all())
+        content = render_to_string(
+            "includes/profile_feed.html", {"page_obj": page_obj}, request
+        )
+        profile_cache.store(key, content)
+    return mark_safe(content)
 
 
+@read_from_replica
 def profile_view(request, username):
     # Получаем пользователя по имени
     user = get_object_or_404(User, username=username)
-    # Получаем все посты пользователя
-    posts = user.posts.all()
-    current_time = timezone.now()
-    
-    # Фильтрация постов для других пользователей (публикуются только те, что опубликованы и в правильной категории)
-    if request.user.username != username:
-        posts = posts.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=current_time,
-        )
-
-    paginator = Paginator(posts, LIMIT_POSTS)  # Пагинация
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)  # Получаем нужную страницу
-    context = {
-        "profile": user,
-        "page_obj": page_obj,
-    }
+    context = {"profile": user}
+    # Владелец видит все свои посты, его страница не кэшируется;
+    # остальные — готовую ленту автора
+    if request.user.username == username:
+        posts = Post.objects.for_feed().filter(author=user)
+        context["page_obj"] = get_page_obj(request, posts)
+    else:
+        context["profile_feed"] = get_profile_feed(request, user)
     return render(request, "blog/profile.html", context)  # Отправляем данные в шаблон
 
 
@@ -83,6 +129,17 @@ class PostMixin:
     form_class = PostForm
     template_name = "blog/create.html"  # Миксин для создания и редактирования постов
 
+    def form_valid(self, form):
+        # Новое фото обрабатывается в фоне, запрос завершается сразу
+        # после сохранения исходного файла
+        image_changed = "image" in form.changed_data and form.instance.image
+        if image_changed:
+            form.instance.image_ready = False
+        response = super().form_valid(form)
+        if image_changed:
+            schedule_image_processing(self.object)
+        return response
+
 
 class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
     pk_url_kwarg = "post_id"
@@ -97,10 +154,17 @@ class PostUpdateView(LoginRequiredMixin, PostMixin, UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         # Проверка, что только автор может редактировать пост
-        if self.get_object().author != self.request.user:
+        if self.get_object().author_id != self.request.user.pk:
             return redirect("blog:post_detail", self.kwargs["post_id"])
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        # Пост загружается один раз: для проверки автора в dispatch
+        # и для формы в get/post используется один и тот же объект
+        if getattr(self, "object", None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["is_edit"] = True  # Добавляем флаг, что это режим редактирования
@@ -111,84 +175,133 @@ class PostUpdateView(LoginRequiredMixin, PostMixin, UpdateView):
 def delete_post(request, post_id):
     template_name = "blog/create.html"
     # Получаем пост для удаления только если он принадлежит текущему пользователю
-    delete_post = get_object_or_404(Post, pk=post_id, author__username=request.user)
+    delete_post = get_object_or_404(Post, pk=post_id, author=request.user)
     if request.method != "POST":
         context = {
             "post": delete_post,
             "is_delete": True,  # Флаг для отображения формы удаления
         }
         return render(request, template_name, context)
-    # Если запрос POST, удаляем пост
-    if delete_post.author == request.user:
-        delete_post.delete()
+    # Если запрос POST, удаляем пост (автор уже проверен в запросе выше)
+    delete_post.delete()
     return redirect("blog:profile", request.user)  # Редирект на страницу профиля
 
 
+@method_decorator(read_from_replica, name="dispatch")
+# ETag и Last-Modified по версии поста: при неизменной версии ответ 304
+# без запроса комментариев и отрисовки
+@method_decorator(conditional_post_page, name="dispatch")
 class PostDetailView(DetailView):
     model = Post
     template_name = "blog/detail.html"
     context_object_name = "post"
     pk_url_kwarg = "post_id"
 
-    def get_object(self):
-        object = super(PostDetailView, self).get_object()
-        # Если пост не опубликован или категория скрыта, выбрасываем ошибку 404
-        if self.request.user != object.author and (
-            not object.is_published or not object.category.is_published
-        ):
-            raise Http404()
-        return object
+    def get_queryset(self):
+        # Пост со связанными объектами одним запросом; чужие неопубликованные
+        # посты отфильтровываются в том же запросе и дают 404
+        return Post.objects.with_related().visible_to(self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()  # Добавляем форму для комментариев
-        context["comments"] = self.object.comments.select_related("author")  # Загружаем комментарии с авторами
+        # Загружаем только первую порцию комментариев с авторами;
+        # следующие порции отдаёт PostCommentsView по курсору
+        paginator = CursorPaginator(
+            self.object.comments.select_related("author"),
+            LIMIT_COMMENTS,
+            ordering=("created_at", "id"),
+        )
+        context["comments"] = paginator.get_page(
+            self.request.GET.get("comments")
+        )
+        # Свои комментарии, ещё не записанные в базу, автор видит в конце
+        # списка
+        if self.request.user.is_authenticated:
+            context["pending_comments"] = comment_buffer.get_pending(
+                self.request, self.object.pk
+            )
         return context
 
 
+class PostCommentsView(PostDetailView):
+    # Фрагмент со следующей порцией комментариев для подгрузки
+    # на странице поста
+    template_name = "includes/comment_list.html"
+
+
+@cache_public_page
+@read_from_replica
 def index(request):
     template = "blog/index.html"
-    current_time = timezone.now()
-    # Фильтруем опубликованные посты с их категориями
-    post = Post.objects.select_related("category").filter(
-        pub_date__lte=current_time,
-        is_published=True,
-        category__is_published=True,
-    )
-    paginator = Paginator(post, LIMIT_POSTS)
-
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)  # Получаем нужную страницу
+    # Опубликованные посты с авторами, категориями и числом комментариев
+    post = Post.objects.published().for_feed()
+    page_obj = get_page_obj(request, post)  # Получаем нужную страницу
     context = {"page_obj": page_obj}
     return render(request, template, context)
 
 
+@cache_public_page
+@read_from_replica
 def category_posts(request, category_slug):
     template = "blog/category.html"
-    current_time = timezone.now()
-    # Получаем категорию по slug и проверяем, что она опубликована
-    category = get_object_or_404(Category, slug=category_slug, is_published=True)
-    post_list = category.posts.select_related("category").filter(
-        is_published=True,
-        pub_date__lte=current_time,
-    )
-    paginator = Paginator(post_list, LIMIT_POSTS)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)  # Получаем нужную страницу
+    # Категория берётся из справочника в памяти процесса
+    category = get_published_category(category_slug)
+    if category is None:
+        raise Http404()
+    page_obj = get_feed_page(request, category.feed_entries.all())
     context = {"category": category, "page_obj": page_obj}
     return render(request, template, context)
 
 
+def search(request):
+    template = "blog/search.html"
+    query = request.GET.get("q", "").strip()
+    page_obj = None
+    if query:
+        # Индекс возвращает id в порядке BM25; видимость проверяется
+        # теми же фильтрами, что и на главной
+        ranked_ids = search_post_ids(query)
+        visible_ids = set(
+            Post.objects.published()
+            .filter(pk__in=ranked_ids)
+            .values_list("pk", flat=True)
+        )
+        paginator = Paginator(
+            [pk for pk in ranked_ids if pk in visible_ids], LIMIT_POSTS
+        )
+        page_obj = paginator.get_page(request.GET.get("page"))
+        page_obj.elided_page_range = paginator.get_elided_page_range(
+            page_obj.number
+        )
+        posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+        page_obj.object_list = [posts[pk] for pk in page_obj.object_list]
+    context = {
+        "query": query,
+        "query_prefix": urlencode({"q": query}) + "&" if query else "",
+        "page_obj": page_obj,
+    }
+    return render(request, template, context)
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)  # Получаем пост по id
+    # Пост проверяется запросом по первичному ключу без загрузки строки
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404()
     form = CommentForm(request.POST)
 
     if form.is_valid():
-        comment = form.save(commit=False)  # Не сохраняем сразу, чтобы добавить автора и пост
-        comment.author = request.user
-        comment.post = post
-        comment.save()  # Сохраняем комментарий
+        # Комментарий ставится в очередь и пишется в базу пачкой вместе
+        # со счётчиками; автор видит его сразу, из своей сессии
+        try:
+            comment_buffer.submit(request, post_id, form.cleaned_data["text"])
+        except RateLimited as error:
+            response = HttpResponse(
+                "Слишком много комментариев, попробуйте позже.", status=429
+            )
+            response["Retry-After"] = math.ceil(error.retry_after)
+            return response
     return redirect("blog:post_detail", post_id)  # Редирект на страницу поста
 
 
@@ -217,6 +330,7 @@ def edit_comment(request, post_id, comment_id):
 
 
 @login_required
+@retry_on_lock
 def delete_comment(request, post_id, comment_id):
     comment = get_object_or_404(Comment, id=comment_id)
     # Проверяем, что только автор может удалить комментарий
@@ -224,7 +338,10 @@ def delete_comment(request, post_id, comment_id):
         return HttpResponseForbidden("У вас нет прав для удаления этого комментария.")
 
     if request.method == "POST":
-        comment.delete()  # Удаляем комментарий
+        # Счётчики поста и автора обновляет сигнал post_delete в той же
+        # транзакции
+        with transaction.atomic():
+            comment.delete()  # Удаляем комментарий
         return redirect("blog:post_detail", post_id)
 
     context = {
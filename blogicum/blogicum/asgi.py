@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+from core.templating import preload_templates  # noqa: E402
+
+# Шаблоны разбираются при старте процесса, а не на первом запросе
+if settings.TEMPLATES_PRELOAD:
+    preload_templates()
@@ -1,169 +0,0 @@
-from pathlib import Path
-
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = (
-    'django-insecure-towmz)2=!8fc=7is8b2&-o0mecab!+dkqbd53^t#)%_rjzybxq'
-)
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-]
-
-
-# Application definition
-
-INSTALLED_APPS = [
-    'django_bootstrap5',
-    'blog.apps.BlogConfig',
-    'pages.apps.PagesConfig',
-    'core.apps.CoreConfig',
-    'users.apps.UsersConfig',
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'debug_toolbar',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-]
-
-INTERNAL_IPS = [
-    '127.0.0.1',
-]
-
-POSTS_PER_PAGE = 5
-
-ROOT_URLCONF = 'blogicum.urls'
-
-TEMPLATES_DIR = BASE_DIR / 'templates'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'blogicum.wsgi.application'
-
-
-# Database
-# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
-
-
-# Password validation
-# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-
-# Internationalization
-# https://docs.djangoproject.com/en/3.2/topics/i18n/
-
-LANGUAGE_CODE = 'ru-RU'
-
-TIME_ZONE = 'UTC'
-
-USE_I18N = True
-
-USE_L10N = True
-
-USE_TZ = True
-
-
-# Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/3.2/howto/static-files/
-
-STATIC_URL = '/static/'
-
-STATICFILES_DIRS = [
-    BASE_DIR / 'static_dev',
-]
-# Default primary key field type
-# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
-
-# Устанавливает тип поля для первичного ключа в моделях, если не указано явно другое.
-# В данном случае это BigAutoField, который является типом для автоинкрементных числовых ключей 
-# с большим диапазоном значений.
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-# Устанавливает представление для обработки ошибок CSRF (Cross Site Request Forgery).
-# Это представление будет вызываться, если происходит ошибка CSRF.
-CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
-
-# Устанавливает пользовательскую модель пользователя для проекта. В данном случае используется модель MyUser
-# из приложения "users", что позволяет добавить дополнительные поля или методы к модели пользователя.
-AUTH_USER_MODEL = 'users.MyUser'
-
-# URL, на который будет перенаправлен пользователь после успешного входа в систему.
-# В данном случае это страница с индексом блога.
-LOGIN_REDIRECT_URL = 'blog:index'
-
-# Устанавливает путь на сервере, где будут храниться загруженные медиафайлы (например, изображения).
-# Это директория 'media' в корне проекта.
-MEDIA_ROOT = BASE_DIR / 'media'
-
-# Настройки для отправки электронных писем в Django. В данном случае используется файл, чтобы сохранять
-# письма на сервере для дальнейшей отладки или обработки.
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
-
-# Путь к директории, где будут сохраняться отправленные электронные письма.
-# Это директория 'sent_emails' в корне проекта.
-EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
-
-# Устанавливает URL, на который пользователи будут перенаправляться, если они пытаются получить доступ
-# к защищенным страницам без авторизации. В данном случае это страница входа.
-LOGIN_URL = 'login'
-
-
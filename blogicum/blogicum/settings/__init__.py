@@ -0,0 +1,18 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Профиль настроек выбирается переменной окружения DJANGO_ENV:
+# dev (по умолчанию) — с панелью отладки, prod — без отладочных
+# приложений и middleware
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек DJANGO_ENV={DJANGO_ENV!r}; '
+        'ожидается dev или prod.'
+    )
@@ -0,0 +1,304 @@
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = (
+    'django-insecure-towmz)2=!8fc=7is8b2&-o0mecab!+dkqbd53^t#)%_rjzybxq'
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# Профили dev и prod задают DEBUG сами
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django_bootstrap5',
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+POSTS_PER_PAGE = 5
+
+# Режим пагинации лент: 'numbered' (номера страниц, COUNT + OFFSET)
+# или 'cursor' (переход по курсору ?cursor=, без подсчёта записей)
+POSTS_PAGINATION = 'numbered'
+
+# Кэш отрисованных карточек постов. Без ALIAS используется LRU в памяти
+# процесса на MAX_ENTRIES карточек; с ALIAS — кэш с этим именем из CACHES
+POST_CARD_CACHE = {
+    'ALIAS': None,
+    'MAX_ENTRIES': 1000,
+}
+
+# Время жизни (в секундах) закэшированных страниц лент для анонимных
+# посетителей; изменения постов сбрасывают кэш сразу
+PUBLIC_PAGE_CACHE_TIMEOUT = 60
+
+# Время жизни (в секундах) закэшированной ленты профиля, которую видят
+# все, кроме владельца; изменения постов автора, его категорий
+# и профиля сбрасывают её сразу
+PROFILE_PAGE_CACHE_TIMEOUT = 300
+
+# Справочники категорий и местоположений (blog.lookups) перечитываются
+# при смене версии в общем кэше и не реже чем раз в это время (секунд)
+LOOKUP_TABLE_TIMEOUT = 60
+
+# Полнотекстовый поиск: 'fts5' (таблица SQLite FTS5, при её отсутствии —
+# индекс в памяти процесса) или 'memory'
+SEARCH_BACKEND = 'fts5'
+# Сколько лучших по BM25 результатов рассматривается для выдачи
+SEARCH_MAX_RESULTS = 500
+
+# Ширины (в пикселях) уменьшенных копий изображений постов и категорий
+# и качество сжатия WebP/JPEG
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVE_QUALITY = 80
+
+# Очередь фоновых задач (core.jobs, воркеры запускает команда run_jobs):
+# пауза между опросами пустой очереди, число попыток, базовая задержка
+# повтора и время, после которого зависшая задача возвращается в очередь
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_DELAY = 10
+JOBS_STALE_TIMEOUT = 600
+# Выполнять задачи сразу после коммита, без воркеров (для разработки)
+JOBS_EAGER = False
+
+# Приём комментариев (blog.comment_buffer): комментарии копятся в памяти
+# процесса и пишутся в базу одной транзакцией раз в COMMENT_FLUSH_INTERVAL
+# секунд или по набору COMMENT_BATCH_SIZE штук. При False комментарий
+# записывается сразу, в рамках запроса
+COMMENT_BUFFERING = True
+COMMENT_FLUSH_INTERVAL = 0.2
+COMMENT_BATCH_SIZE = 100
+# Каталог журналов принятых, но ещё не записанных комментариев: их
+# дописывает в базу следующий процесс, если процесс-владелец упал.
+# None — без журнала (комментарии в очереди теряются при падении)
+COMMENT_SPOOL_DIR = BASE_DIR / 'comment_spool'
+# Сколько раз подряд пачка пытается записаться, прежде чем её комментарии
+# уйдут из очереди в файл .failed в COMMENT_SPOOL_DIR
+COMMENT_MAX_ATTEMPTS = 5
+# Token bucket на пользователя: в среднем COMMENT_RATE комментариев
+# в секунду и не больше COMMENT_BURST подряд; None отключает лимит.
+# Ведра и отметки повторов хранятся в общем кэше (CACHES)
+COMMENT_RATE = 0.2
+COMMENT_BURST = 5
+# Тот же текст к тому же посту в течение этого времени (секунд) считается
+# повторной отправкой формы и отбрасывается
+COMMENT_DEDUP_SECONDS = 10
+# Сколько секунд автор видит свой ещё не записанный комментарий
+COMMENT_PENDING_SECONDS = 60
+
+# Асинхронные версии главной, категорий, профиля и страницы поста
+# (blog.async_views) для запуска под ASGI-сервером
+BLOG_ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+
+# Метрики запросов (core.middleware.RequestMetricsMiddleware).
+# /metrics доступен сотрудникам и по заголовку Authorization: Bearer <токен>
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Порог медленного SQL-запроса (мс) и доля таких запросов, попадающих
+# в журнал core.metrics.slow_queries
+METRICS_SLOW_QUERY_MS = 100
+METRICS_SLOW_QUERY_SAMPLE_RATE = 0.1
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+# Загрузчики шаблонов. По умолчанию они обёрнуты кэширующим загрузчиком:
+# каждый шаблон (и каждый {% include %}) разбирается один раз за жизнь
+# процесса, а не на каждый запрос. Профиль dev читает шаблоны с диска
+# при каждой отрисовке
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
+        },
+    },
+]
+# Разбирать все шаблоны при старте WSGI/ASGI-процесса (core.templating)
+TEMPLATES_PRELOAD = True
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+# Настройки SQLite для каждого нового соединения (core.sqlite.apply_pragmas);
+# по умолчанию — настройки SQLite без изменений, профиль prod задаёт свои
+SQLITE_PRAGMAS = {}
+# Повторы записи при «database is locked» (core.sqlite.retry_on_lock):
+# число повторов и начальная задержка в секундах, далее удваивается
+SQLITE_LOCK_RETRIES = 3
+SQLITE_LOCK_RETRY_DELAY = 0.05
+
+# Реплики только для чтения: файлы SQLite через запятую в переменной
+# окружения DATABASE_REPLICAS (например, replica.sqlite3). Локально
+# реплики обновляет команда sync_replicas
+REPLICA_FILES = [
+    name.strip()
+    for name in os.environ.get('DATABASE_REPLICAS', '').split(',')
+    if name.strip()
+]
+DATABASES.update({
+    f'replica{number}': {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for number, name in enumerate(REPLICA_FILES)
+})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Сколько секунд после записи сессия читает только основную базу
+REPLICA_PIN_SECONDS = 10
+
+# Кэш, общий для всех процессов сайта: в нём живут поколения и версии
+# кэшей страниц, профилей и справочников, ведра лимита комментариев
+# и отметки повторных отправок. Файловый кэш общий для процессов одного
+# сервера; для нескольких серверов его нужно заменить на memcached
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'static_dev',
+]
+# Default primary key field type
+# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
+
+# Устанавливает тип поля для первичного ключа в моделях, если не указано явно другое.
+# В данном случае это BigAutoField, который является типом для автоинкрементных числовых ключей
+# с большим диапазоном значений.
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Устанавливает представление для обработки ошибок CSRF (Cross Site Request Forgery).
+# Это представление будет вызываться, если происходит ошибка CSRF.
+CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+# Устанавливает пользовательскую модель пользователя для проекта. В данном случае используется модель MyUser
+# из приложения "users", что позволяет добавить дополнительные поля или методы к модели пользователя.
+AUTH_USER_MODEL = 'users.MyUser'
+
+# URL, на который будет перенаправлен пользователь после успешного входа в систему.
+# В данном случае это страница с индексом блога.
+LOGIN_REDIRECT_URL = 'blog:index'
+
+# Устанавливает путь на сервере, где будут храниться загруженные медиафайлы (например, изображения).
+# Это директория 'media' в корне проекта.
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Настройки для отправки электронных писем в Django. В данном случае используется файл, чтобы сохранять
+# письма на сервере для дальнейшей отладки или обработки.
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+# Путь к директории, где будут сохраняться отправленные электронные письма.
+# Это директория 'sent_emails' в корне проекта.
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Устанавливает URL, на который пользователи будут перенаправляться, если они пытаются получить доступ
+# к защищенным страницам без авторизации. В данном случае это страница входа.
+LOGIN_URL = 'login'
@@ -0,0 +1,22 @@
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE, TEMPLATE_LOADERS, TEMPLATES
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+# Шаблоны читаются с диска при каждой отрисовке: правки видны без
+# перезапуска сервера
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {**TEMPLATES[0]['OPTIONS'], 'loaders': TEMPLATE_LOADERS},
+    },
+]
+TEMPLATES_PRELOAD = False
@@ -0,0 +1,63 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES
+
+
+def require_env(name):
+    value = os.environ.get(name, '').strip()
+    if not value:
+        raise ImproperlyConfigured(
+            f'Для профиля prod нужна переменная окружения {name}.'
+        )
+    return value
+
+
+DEBUG = False
+
+# Ключ и допустимые адреса задаются только окружением: ключ из base
+# опубликован в репозитории. DJANGO_ALLOWED_HOSTS — имена через запятую
+SECRET_KEY = require_env('DJANGO_SECRET_KEY')
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in require_env('DJANGO_ALLOWED_HOSTS').split(',')
+    if host.strip()
+]
+
+# Соединение переживает запрос, а не открывается на каждый заново;
+# busy timeout — сколько секунд ждать освобождения блокировки.
+# Относится и к основной базе, и к репликам
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 60
+    database['OPTIONS'] = {**database.get('OPTIONS', {}), 'timeout': 20}
+
+# Настройки SQLite для каждого нового соединения (core.sqlite.apply_pragmas):
+# WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+# не теряет целостность при сбое, mmap и кэш страниц ускоряют чтение
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Без отладочных приложений и middleware: при старте процесса
+# импортируется только то, что нужно для обработки запросов.
+# Контекстный процессор debug без DEBUG ничего не добавляет
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+        },
+    },
+]
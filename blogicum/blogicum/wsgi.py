@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from core.templating import preload_templates  # noqa: E402
+
+# Шаблоны разбираются при старте процесса, а не на первом запросе
+if settings.TEMPLATES_PRELOAD:
+    preload_templates()
@@ -12,3 +12,14 @@ class CoreConfig(AppConfig):
     # каталога, в котором находится ваше приложение. В данном случае приложение 
     # называется "core".
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from core import metrics
+        from core.sqlite import apply_pragmas
+
+        # Замеры SQL-запросов и отрисовки шаблонов для RequestMetricsMiddleware
+        metrics.install()
+        # Настройки SQLite для каждого нового соединения
+        connection_created.connect(apply_pragmas)
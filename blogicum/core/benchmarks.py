@@ -0,0 +1,25 @@
+import math
+import statistics
+
+
+def percentile(values, percent):
+    # Процентиль методом ближайшего ранга по отсортированным значениям
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(latencies):
+    # Сводка задержек в миллисекундах для отчётов бенчмарков
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        'count': len(milliseconds),
+        'mean_ms': round(statistics.fmean(milliseconds), 3)
+        if milliseconds else 0.0,
+        'p50_ms': round(percentile(milliseconds, 50), 3),
+        'p95_ms': round(percentile(milliseconds, 95), 3),
+        'p99_ms': round(percentile(milliseconds, 99), 3),
+        'max_ms': round(max(milliseconds, default=0.0), 3),
+    }
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Ключ сессии: до этого момента (unix time) запросы сессии читают только
+# основную базу, чтобы пользователь сразу видел свои изменения
+PIN_SESSION_KEY = '_db_pinned_until'
+# Приложения, которые всегда читаются с основной базы: сессия, созданная
+# при входе, может ещё не дойти до реплики
+PRIMARY_ONLY_APPS = {'sessions'}
+
+# Реплика, выбранная для текущего запроса; None — основная база
+_replica = ContextVar('db_replica', default=None)
+# Модели, в которые текущий запрос писал (ReplicaPinningMiddleware);
+# None — записи не отслеживаются
+_writes = ContextVar('db_writes', default=None)
+
+
+class ReplicaRouter:
+    # Чтение в представлениях с read_from_replica идёт на реплику,
+    # всё остальное — на основную базу
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Запись сессии не закрепляет её: сессии и так читаются
+        # с основной базы
+        writes = _writes.get()
+        if writes is not None and (
+            model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            writes.add(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит вместе с данными от основной базы
+        return db == DEFAULT_DB_ALIAS
+
+
+def track_writes():
+    # Начинает учёт записей; возвращает множество моделей, которое
+    # пополняет роутер, и токен для _writes.reset
+    writes = set()
+    return writes, _writes.set(writes)
+
+
+def stop_tracking_writes(token):
+    _writes.reset(token)
+
+
+def pin_to_primary(request):
+    request.session[PIN_SESSION_KEY] = (
+        time.time() + settings.REPLICA_PIN_SECONDS
+    )
+
+
+def choose_replica(request):
+    if not settings.DATABASE_REPLICAS:
+        return None
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if request.session.get(PIN_SESSION_KEY, 0) > time.time():
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def read_from_replica(view):
+    # Все запросы представления идут на одну случайную реплику, если
+    # сессия не закреплена за основной базой недавней записью.
+    # Подходит и для обычных, и для асинхронных представлений
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            alias = await sync_to_async(choose_replica)(request)
+            token = _replica.set(alias)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _replica.set(choose_replica(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+
+    return wrapper
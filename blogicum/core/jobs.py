@@ -0,0 +1,80 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Зарегистрированные обработчики задач: имя -> функция
+handlers = {}
+
+
+def register(name):
+    # Декоратор регистрации обработчика фоновой задачи
+    def decorator(func):
+        handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, /, **payload):
+    # Задача создаётся в текущей транзакции вместе с данными, которые она
+    # обрабатывает; в режиме JOBS_EAGER выполняется сразу после коммита
+    job = Job.objects.create(name=name, payload=payload)
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run(job))
+    return job
+
+
+def claim():
+    # Захват следующей задачи: UPDATE с проверкой статуса гарантирует,
+    # что одну задачу не возьмут два воркера
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_after__lte=now
+    ).values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, locked_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job):
+    job.attempts += 1
+    try:
+        handlers[job.name](**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        logger.exception('Задача %s завершилась ошибкой', job)
+        if job.attempts < settings.JOBS_MAX_ATTEMPTS:
+            # Повтор с экспоненциальной задержкой
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.DONE
+        job.error = ''
+    job.locked_at = None
+    job.save(update_fields=(
+        'status', 'attempts', 'run_after', 'locked_at', 'error'
+    ))
+    return job
+
+
+def release_stale(timeout):
+    # Задачи, зависшие в RUNNING после падения воркера, возвращаются в очередь
+    deadline = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=deadline
+    ).update(status=Job.PENDING, locked_at=None)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templating import preload_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны каталога templates/: шаг сборки при '
+        'выкладке, который находит ошибки синтаксиса до первого запроса '
+        'и показывает время компиляции каждого шаблона.'
+    )
+
+    def handle(self, *args, **options):
+        timings, errors = preload_templates()
+        for name, seconds in sorted(
+            timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            self.stdout.write(f'{seconds * 1000:8.2f} мс  {name}')
+        total = sum(timings.values()) * 1000
+        self.stdout.write(
+            f'Разобрано шаблонов: {len(timings)} за {total:.1f} мс.'
+        )
+        if errors:
+            for name, error in errors.items():
+                self.stderr.write(self.style.ERROR(f'{name}: {error}'))
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}.')
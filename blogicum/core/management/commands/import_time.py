@@ -0,0 +1,132 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PREFIX = 'import time:'
+
+
+def parse_importtime(output):
+    # Строки вывода python -X importtime:
+    # «import time: self [us] | cumulative | imported package»,
+    # вложенность импорта передаётся отступом имени модуля
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith(PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(PREFIX):].split('|', 2)
+        # Строка заголовка
+        if not self_us.strip().isdigit():
+            continue
+        module = name.strip()
+        rows.append({
+            'module': module,
+            'depth': (len(name.rstrip()) - len(module) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает импорт модуля (по умолчанию blogicum.wsgi, то есть '
+        'полный старт приложения) в отдельном интерпретаторе с '
+        'python -X importtime и выводит самые медленные импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='blogicum.wsgi')
+        parser.add_argument(
+            '--env', choices=('dev', 'prod'),
+            default=os.environ.get('DJANGO_ENV', 'dev'),
+            help='Профиль настроек (DJANGO_ENV) для замера.',
+        )
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'self'), default='cumulative',
+            help='cumulative — вместе с вложенными импортами, self — только '
+                 'код самого модуля.',
+        )
+        parser.add_argument(
+            '--packages', action='store_true',
+            help='Суммировать собственное время по пакетам верхнего уровня.',
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def measure(self, module, env):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=settings.BASE_DIR,
+            # Профиль prod требует ключ и адреса из окружения; для замера
+            # подходят значения текущего профиля, если их не задали явно
+            env={
+                'DJANGO_SECRET_KEY': settings.SECRET_KEY,
+                'DJANGO_ALLOWED_HOSTS': ','.join(settings.ALLOWED_HOSTS),
+                **os.environ,
+                'DJANGO_ENV': env,
+            },
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            errors = [
+                line for line in result.stderr.splitlines()
+                if not line.startswith(PREFIX)
+            ]
+            raise CommandError(
+                f'Не удалось импортировать {module}:\n' + '\n'.join(errors)
+            )
+        return parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        rows = self.measure(options['module'], options['env'])
+        total = sum(row['cumulative_ms'] for row in rows if not row['depth'])
+        if options['packages']:
+            packages = defaultdict(float)
+            for row in rows:
+                packages[row['module'].split('.')[0]] += row['self_ms']
+            slowest = sorted(
+                (
+                    {'package': name, 'self_ms': round(value, 1)}
+                    for name, value in packages.items()
+                ),
+                key=lambda row: row['self_ms'],
+                reverse=True,
+            )[:options['top']]
+        else:
+            key = f"{options['sort']}_ms"
+            slowest = sorted(
+                rows, key=lambda row: row[key], reverse=True
+            )[:options['top']]
+
+        report = {
+            'module': options['module'],
+            'env': options['env'],
+            'total_ms': round(total, 1),
+            'modules': len(rows),
+            'slowest': slowest,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+        self.stdout.write(
+            f"Импорт {options['module']} ({options['env']}): "
+            f'{total:.1f} мс, модулей {len(rows)}'
+        )
+        for row in slowest:
+            if options['packages']:
+                self.stdout.write(
+                    f"{row['self_ms']:10.1f} мс  {row['package']}"
+                )
+            else:
+                self.stdout.write(
+                    f"{row['cumulative_ms']:10.1f} мс "
+                    f"{row['self_ms']:10.1f} мс  "
+                    f"{row['module']}"
+                )
@@ -0,0 +1,71 @@
+import multiprocessing
+import time
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+def work(poll_interval, once):
+    # Цикл одного воркера; после fork соединения с БД открываются заново,
+    # а при запуске через spawn (Windows, macOS) Django настраивается с нуля
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    while True:
+        job = jobs.claim()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        jobs.run(job)
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул воркеров, выполняющих фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Количество процессов-воркеров.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить накопившиеся задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        released = jobs.release_stale(settings.JOBS_STALE_TIMEOUT)
+        if released:
+            self.stdout.write(
+                f'Возвращено в очередь зависших задач: {released}'
+            )
+        poll_interval = settings.JOBS_POLL_INTERVAL
+        if options['workers'] <= 1:
+            work(poll_interval, options['once'])
+            return
+
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=work, args=(poll_interval, options['once'])
+            )
+            for _ in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Запущено воркеров: {len(workers)}')
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
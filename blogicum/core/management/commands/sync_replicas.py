@@ -0,0 +1,37 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик (DATABASE_REPLICAS) '
+        'через backup API SQLite: локальная замена репликации для '
+        'проверки маршрутизации чтения.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS).')
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError(
+                'Команда работает только с SQLite; на других СУБД '
+                'реплики наполняет их собственная репликация.'
+            )
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                # Открытые соединения Django с репликой закрываются,
+                # чтобы следующие запросы увидели новую копию
+                connections[alias].close()
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопирована основная база')
+        finally:
+            source.close()
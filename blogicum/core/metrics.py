@@ -0,0 +1,211 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+
+slow_query_logger = logging.getLogger('core.metrics.slow_queries')
+
+# Границы корзин гистограмм, секунды
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Замеры текущего запроса; ContextVar копируется в потоки sync_to_async,
+# поэтому запросы к БД из асинхронных представлений тоже учитываются
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    # Замеры одного запроса
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_name = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def add_query(self, duration):
+        with self._lock:
+            self.queries += 1
+            self.db_time += duration
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        # Значение заголовка Server-Timing, длительности в миллисекундах
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ))
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    # Агрегаты в памяти процесса: гистограммы и счётчики по имени URL
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+
+    def observe(self, metrics, status):
+        view = metrics.view_name or 'unresolved'
+        with self._lock:
+            self.histograms['request_duration_seconds', view].observe(
+                metrics.total_time
+            )
+            self.histograms['db_duration_seconds', view].observe(
+                metrics.db_time
+            )
+            self.histograms['template_duration_seconds', view].observe(
+                metrics.template_time
+            )
+            self.counters['requests_total', view, str(status)] += 1
+            self.counters['db_queries_total', view] += metrics.queries
+            self.counters['cache_hits_total', view] += metrics.cache_hits
+            self.counters['cache_misses_total', view] += metrics.cache_misses
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def export(self):
+        # Текстовый формат Prometheus (exposition format 0.0.4)
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        lines = []
+        described = set()
+        for (name, view), histogram in histograms:
+            metric = f'blogicum_{name}'
+            if metric not in described:
+                described.add(metric)
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{view="{view}",le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{metric}_sum{{view="{view}"}} {histogram.sum}')
+            lines.append(f'{metric}_count{{view="{view}"}} {histogram.count}')
+        for (name, view, *rest), value in counters:
+            metric = f'blogicum_{name}'
+            if metric not in described:
+                described.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            labels = f'view="{view}"'
+            if rest:
+                labels += f',status="{rest[0]}"'
+            lines.append(f'{metric}{{{labels}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def set_view_name(name):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.view_name = name
+
+
+def record_cache(hit):
+    # Вызывается кэшами карточек и страниц
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def query_timer(execute, sql, params, many, context):
+    # Обёртка выполнения SQL: время и число запросов, выборочный журнал
+    # медленных запросов
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        metrics.add_query(duration)
+        if (
+            duration * 1000 >= settings.METRICS_SLOW_QUERY_MS
+            and random.random() < settings.METRICS_SLOW_QUERY_SAMPLE_RATE
+        ):
+            slow_query_logger.warning(
+                'Медленный запрос %.1f мс в %s: %s',
+                duration * 1000,
+                metrics.view_name or 'unresolved',
+                sql,
+            )
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # Обёртка ставится на каждое новое соединение, в том числе на
+    # соединения потоков, в которых работают асинхронные представления
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+_original_render = Template.render
+
+
+def timed_render(self, context=None, request=None):
+    # Учитывается только внешняя отрисовка: вложенные шаблоны (карточки
+    # постов через render_to_string) уже входят в её время
+    metrics = _current.get()
+    if metrics is None or metrics.template_depth:
+        return _original_render(self, context, request)
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics.template_time += time.perf_counter() - started
+        metrics.template_depth -= 1
+
+
+def install():
+    connection_created.connect(install_query_timer)
+    Template.render = timed_render
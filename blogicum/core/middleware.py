@@ -0,0 +1,49 @@
+from django.conf import settings
+
+from core import metrics
+from core.db_router import pin_to_primary, stop_tracking_writes, track_writes
+
+
+class RequestMetricsMiddleware:
+    # Замеры каждого запроса: число и время SQL-запросов, время отрисовки
+    # шаблонов, попадания в кэш и общее время. Итог уходит в заголовок
+    # Server-Timing и в агрегаты для /metrics
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        response['Server-Timing'] = request_metrics.server_timing()
+        metrics.registry.observe(request_metrics, response.status_code)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Имя известно до вызова представления: его получают и записи
+        # журнала медленных запросов, сделанные внутри представления
+        metrics.set_view_name(request.resolver_match.view_name)
+
+
+class ReplicaPinningMiddleware:
+    # После успешного запроса, который что-то записал в базу, сессия
+    # на REPLICA_PIN_SECONDS читает только основную базу: редирект после
+    # добавления комментария или поста не должен попасть на отстающую
+    # реплику. Запросы без записей (например, анонимный POST с ошибкой
+    # формы) сессию не закрепляют и не создают
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        writes, token = track_writes()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_tracking_writes(token)
+        if writes and response.status_code < 400:
+            pin_to_primary(request)
+        return response
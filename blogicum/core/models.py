@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class PublishedModel(models.Model):
@@ -24,3 +25,57 @@ class PublishedModel(models.Model):
         # Она может быть использована как родительская для других моделей, чтобы 
         # наследовать поля и функциональность.
         abstract = True
+
+
+class Job(models.Model):
+    # Фоновая задача в очереди на базе данных; задачи выполняет
+    # команда run_jobs, внешний брокер не нужен
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    # Имя обработчика, зарегистрированного через core.jobs.register
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    # Аргументы обработчика
+    payload = models.JSONField(default=dict, verbose_name='Параметры')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток'
+    )
+    # Задача не берётся в работу раньше этого времени (для повторов)
+    run_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Выполнить после'
+    )
+    locked_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Добавлено'
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('id',)
+        indexes = (
+            # Выборка следующей задачи воркером
+            models.Index(
+                fields=('run_after', 'id'),
+                name='job_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,28 @@
+import time
+
+from django.core.cache import cache
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        # Через сколько секунд появится следующий токен
+        self.retry_after = retry_after
+
+
+def consume(key, rate, burst):
+    # Token bucket в кэше по умолчанию: ведро на burst токенов пополняется
+    # со скоростью rate токенов в секунду, каждое действие забирает один.
+    # Чтение и запись ведра не атомарны, поэтому при гонке параллельных
+    # запросов лимит может быть превышен на единицы. rate=None — без лимита
+    if rate is None:
+        return
+    cache_key = f'ratelimit:{key}'
+    now = time.time()
+    tokens, updated = cache.get(cache_key, (burst, now))
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens < 1:
+        raise RateLimited((1 - tokens) / rate)
+    # Запись истекает, когда ведро заполнилось бы снова: полное ведро
+    # совпадает со значением по умолчанию
+    cache.set(cache_key, (tokens - 1, now), int(burst / rate) + 1)
@@ -0,0 +1,51 @@
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    # Обработчик connection_created: настройки SQLITE_PRAGMAS для каждого
+    # нового соединения (при CONN_MAX_AGE соединения живут между запросами)
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+def retry_on_lock(func):
+    # Повтор записи, когда SQLite отвечает «database is locked» даже после
+    # ожидания busy timeout: транзакция, начатая чтением, не может ждать
+    # освобождения блокировки записи и сразу получает SQLITE_BUSY.
+    # Оборачиваемая функция должна писать только в transaction.atomic,
+    # чтобы неудачная попытка откатывалась целиком
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = settings.SQLITE_LOCK_RETRIES
+        for attempt in range(attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if (
+                    not is_locked(error)
+                    or attempt == attempts
+                    or connection.in_atomic_block
+                ):
+                    raise
+                delay = settings.SQLITE_LOCK_RETRY_DELAY * 2 ** attempt
+                logger.warning(
+                    'База заблокирована, повтор %s через %.3f с',
+                    attempt + 1,
+                    delay,
+                )
+                time.sleep(delay)
+    return wrapper
@@ -0,0 +1,30 @@
+import time
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+
+
+def iter_template_names(engine):
+    # Имена всех шаблонов из DIRS (каталог templates/ проекта)
+    for directory in engine.dirs:
+        root = Path(directory)
+        for path in sorted(root.rglob('*.html')):
+            yield path.relative_to(root).as_posix()
+
+
+def preload_templates(alias='django'):
+    # Разбор всех шаблонов проекта заранее: кэширующий загрузчик хранит
+    # разобранные шаблоны до конца жизни процесса, и первый запрос не
+    # тратит время на компиляцию. Возвращает время разбора каждого шаблона
+    # и ошибки синтаксиса
+    engine = engines[alias].engine
+    timings, errors = {}, {}
+    for name in iter_template_names(engine):
+        started = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = error
+        else:
+            timings[name] = time.perf_counter() - started
+    return timings, errors
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from core.metrics import registry
+
+
+def has_metrics_access(request):
+    # Доступ по токену (для сборщика метрик) или для сотрудников
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if token and constant_time_compare(authorization, f'Bearer {token}'):
+        return True
+    return request.user.is_staff
+
+
+def metrics_view(request):
+    if not has_metrics_access(request):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.export(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-17 16:01
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+import users.models
+
+
+def fill_user_stats(apps, schema_editor):
+    MyUser = apps.get_model('users', 'MyUser')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    posts = (
+        Post.objects.filter(
+            author=models.OuterRef('pk'),
+            is_live=True,
+            category__is_published=True,
+        )
+        .order_by()
+        .values('author')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    comments = (
+        Comment.objects.filter(author=models.OuterRef('pk'))
+        .order_by()
+        .values('author')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    MyUser.objects.update(
+        posts_count=Coalesce(models.Subquery(posts), 0),
+        comments_count=Coalesce(models.Subquery(comments), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('blog', '0011_feed_entries'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='myuser',
+            managers=[
+                ('objects', users.models.MyUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='myuser',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='myuser',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Публикаций'),
+        ),
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,64 @@
 # Импорт моделей Django, включая модель AbstractUser, которая предоставляет базовую структуру для пользователей.
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Coalesce
+from django.contrib.auth.models import AbstractUser, UserManager
+
+
+class MyUserQuerySet(models.QuerySet):
+
+    # Учёт новых и удалённого комментария пользователя
+    def comment_added(self, count=1):
+        return self.update(comments_count=models.F('comments_count') + count)
+
+    def comment_removed(self):
+        return self.update(comments_count=models.F('comments_count') - 1)
+
+    # Пересчёт числа опубликованных постов (исправление расхождений)
+    def recount_posts(self):
+        from blog.models import Post
+
+        totals = (
+            Post.objects.published()
+            .filter(author=models.OuterRef('pk'))
+            .order_by()
+            .values('author')
+            .annotate(total=models.Count('pk'))
+            .values('total')
+        )
+        return self.update(posts_count=Coalesce(models.Subquery(totals), 0))
+
+    # Пересчёт числа комментариев по таблице комментариев
+    def recount_comments(self):
+        from blog.models import Comment
+
+        totals = (
+            Comment.objects.filter(author=models.OuterRef('pk'))
+            .order_by()
+            .values('author')
+            .annotate(total=models.Count('pk'))
+            .values('total')
+        )
+        return self.update(
+            comments_count=Coalesce(models.Subquery(totals), 0)
+        )
+
+
+class MyUserManager(UserManager.from_queryset(MyUserQuerySet)):
+    pass
+
 
 # Кастомная модель пользователя, расширяющая AbstractUser
 class MyUser(AbstractUser):
     # Дополнительное поле 'bio' для хранения биографии пользователя.
     bio = models.TextField('Биография', blank=True)
+    # Счётчики для шапки профиля, чтобы не считать их при каждом показе.
+    # Их поддерживают сигналы blog.signals, расхождения исправляет
+    # команда recount_user_stats
+    posts_count = models.PositiveIntegerField(
+        'Публикаций', default=0, editable=False
+    )
+    comments_count = models.PositiveIntegerField(
+        'Комментариев', default=0, editable=False
+    )
+
+    objects = MyUserManager()
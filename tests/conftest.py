@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+from django.utils import timezone
+
+from blog import fragments, lookups
+from blog.models import Category, Location, Post
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings):
+    # Кэши страниц, карточек и справочников не переходят между тестами;
+    # общий файловый кэш сайта тестами не используется
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    # Журнал комментариев включают только тесты, которым он нужен
+    settings.COMMENT_SPOOL_DIR = None
+    for cache in caches.all():
+        cache.clear()
+    fragments.get_backend().clear()
+    for table in (lookups.categories, lookups.locations):
+        table._version = None
+    yield
+
+
+@pytest.fixture
+def author(django_user_model):
+    return django_user_model.objects.create_user(
+        username='author', password='password'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='reader', password='password'
+    )
+
+
+@pytest.fixture
+def author_client(author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+@pytest.fixture
+def another_client(another_user):
+    client = Client()
+    client.force_login(another_user)
+    return client
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(
+        title='Путешествия', description='Описание', slug='travel'
+    )
+
+
+@pytest.fixture
+def location(db):
+    return Location.objects.create(name='Москва')
+
+
+@pytest.fixture
+def make_posts(author, category, location):
+    def make_posts(count, **kwargs):
+        now = timezone.now()
+        return [
+            Post.objects.create(
+                title=f'Пост {number}',
+                text='Текст',
+                pub_date=now - timedelta(minutes=number + 1),
+                author=author,
+                category=category,
+                location=location,
+                **kwargs,
+            )
+            for number in range(count)
+        ]
+    return make_posts
+
+
+@pytest.fixture
+def post(make_posts):
+    return make_posts(1)[0]
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from blog import comment_buffer
+from blog.models import Comment
+
+
+@pytest.fixture
+def entry(post, another_user):
+    return {
+        'post_id': post.pk,
+        'author_id': another_user.pk,
+        'text': 'Комментарий',
+        'created_at': '2024-01-01T00:00:00+00:00',
+    }
+
+
+@pytest.fixture
+def spool_dir(settings, tmp_path):
+    settings.COMMENT_SPOOL_DIR = tmp_path
+    return tmp_path
+
+
+def test_failed_batch_is_requeued(entry, monkeypatch):
+    buffer = comment_buffer.CommentBuffer()
+    buffer._entries = [entry]
+
+    def fail(entries):
+        raise DatabaseError('database is locked')
+
+    monkeypatch.setattr(comment_buffer, 'write_batch', fail)
+    assert buffer.flush() == 0
+    assert buffer._entries == [entry]
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert Comment.objects.filter(text=entry['text']).exists()
+
+
+def test_orphaned_spool_is_recovered(entry, spool_dir):
+    path = spool_dir / '1-1.jsonl'
+    # Последняя строка оборвана: процесс убили во время записи
+    path.write_text(json.dumps(entry) + '\n{"post_id": ', encoding='utf-8')
+    comment_buffer.CommentBuffer().recover()
+    assert Comment.objects.filter(text=entry['text']).count() == 1
+    assert not path.exists()
+
+
+def test_spool_of_running_process_is_kept(entry, spool_dir):
+    owner = comment_buffer.CommentSpool()
+    owner.append(entry)
+    comment_buffer.CommentBuffer().recover()
+    assert not Comment.objects.exists()
+    assert len(list(spool_dir.glob('*.jsonl'))) == 1
+
+
+def test_comment_does_not_write_session(author_client, author, post,
+                                        monkeypatch):
+    queued = []
+    monkeypatch.setattr(comment_buffer.buffer, 'add', queued.append)
+    url = reverse('blog:add_comment', args=[post.pk])
+    with CaptureQueriesContext(connection) as context:
+        author_client.post(url, {'text': 'Новый'})
+    assert [entry['text'] for entry in queued] == ['Новый']
+    assert not any(
+        'django_session' in query['sql']
+        and not query['sql'].startswith('SELECT')
+        for query in context.captured_queries
+    )
+    response = author_client.get(reverse('blog:post_detail', args=[post.pk]))
+    assert [c['text'] for c in response.context['pending_comments']] == [
+        'Новый'
+    ]
+
+
+def test_batch_is_set_aside_after_max_attempts(entry, spool_dir, settings,
+                                               monkeypatch):
+    settings.COMMENT_MAX_ATTEMPTS = 2
+    buffer = comment_buffer.CommentBuffer()
+    buffer._entries = [entry]
+
+    def fail(entries):
+        raise DatabaseError('disk I/O error')
+
+    monkeypatch.setattr(comment_buffer, 'write_batch', fail)
+    buffer.flush()
+    assert buffer._entries == [entry]
+    buffer.flush()
+    assert buffer._entries == []
+    [failed] = spool_dir.glob('*.failed')
+    assert json.loads(failed.read_text(encoding='utf-8'))['text'] == (
+        entry['text']
+    )
+
+    # Следующие комментарии очередь записывает как обычно
+    monkeypatch.undo()
+    buffer._entries = [dict(entry, text='Следующий')]
+    assert buffer.flush() == 1
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'Следующий'
+    ]
+
+
+def test_written_comment_keeps_queued_time(entry, post, author):
+    latest = Comment.objects.create(post=post, author=author, text='Новый')
+    comment_buffer.write_batch([entry])
+    comment = Comment.objects.get(text=entry['text'])
+    assert comment.created_at == parse_datetime(entry['created_at'])
+    post.refresh_from_db()
+    assert post.comments_count == 2
+    # Запись старого комментария не сдвигает время последнего назад
+    assert post.last_commented_at == latest.created_at
@@ -0,0 +1,24 @@
+from blog.models import Comment
+
+
+def test_comment_create_and_delete_update_counters(post, another_user):
+    first = Comment.objects.create(post=post, author=another_user, text='1')
+    second = Comment.objects.create(post=post, author=another_user, text='2')
+    post.refresh_from_db()
+    another_user.refresh_from_db()
+    assert post.comments_count == 2
+    assert post.last_commented_at == second.created_at
+    assert another_user.comments_count == 2
+
+    second.delete()
+    post.refresh_from_db()
+    assert post.comments_count == 1
+    assert post.last_commented_at == first.created_at
+
+
+def test_cascade_delete_of_author_updates_post(post, another_user):
+    Comment.objects.create(post=post, author=another_user, text='Текст')
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comments_count == 0
+    assert post.last_commented_at is None
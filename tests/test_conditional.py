@@ -0,0 +1,43 @@
+from django.urls import reverse
+
+from blog.models import Comment
+
+
+def get_detail(client, post, etag=None):
+    headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+    return client.get(reverse('blog:post_detail', args=[post.pk]), **headers)
+
+
+def test_unchanged_post_returns_not_modified(client, post):
+    etag = get_detail(client, post)['ETag']
+    assert get_detail(client, post, etag).status_code == 304
+
+
+# Комментарии, добавленные и удалённые не через представления (админка,
+# оболочка, каскадное удаление автора), тоже меняют ETag страницы
+def test_comment_created_outside_views_changes_etag(client, post,
+                                                    another_user):
+    etag = get_detail(client, post)['ETag']
+    Comment.objects.create(post=post, author=another_user, text='Новый')
+    response = get_detail(client, post, etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+def test_cascade_delete_changes_etag(client, post, another_user):
+    Comment.objects.create(post=post, author=another_user, text='Старый')
+    etag = get_detail(client, post)['ETag']
+    another_user.delete()
+    response = get_detail(client, post, etag)
+    assert response.status_code == 200
+    assert 'Старый' not in response.content.decode()
+
+
+def test_commenter_rename_changes_etag(client, post, another_user):
+    Comment.objects.create(post=post, author=another_user, text='Текст')
+    etag = get_detail(client, post)['ETag']
+    another_user.username = 'renamed'
+    another_user.save()
+    response = get_detail(client, post, etag)
+    assert response.status_code == 200
+    assert '@renamed' in response.content.decode()
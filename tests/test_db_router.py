@@ -0,0 +1,97 @@
+import pytest
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.models import Location, Post
+from core import db_router
+from core.middleware import ReplicaPinningMiddleware
+
+router = db_router.ReplicaRouter()
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica0']
+
+
+@pytest.fixture
+def make_request():
+    def make_request(method='get'):
+        request = getattr(RequestFactory(), method)('/')
+        request.session = SessionStore()
+        return request
+    return make_request
+
+
+def read_database(request):
+    # Куда роутер направит чтение внутри представления
+    @db_router.read_from_replica
+    def view(request):
+        return HttpResponse(router.db_for_read(Post))
+
+    return view(request).content.decode()
+
+
+def test_get_reads_from_replica(make_request):
+    assert read_database(make_request()) == 'replica0'
+
+
+def test_post_reads_from_primary(make_request):
+    assert read_database(make_request('post')) == DEFAULT_DB_ALIAS
+
+
+def test_pinned_session_reads_from_primary(make_request):
+    request = make_request()
+    db_router.pin_to_primary(request)
+    assert read_database(request) == DEFAULT_DB_ALIAS
+
+
+def test_sessions_always_read_from_primary(make_request):
+    @db_router.read_from_replica
+    def view(request):
+        return HttpResponse(router.db_for_read(Session))
+
+    assert view(make_request()).content.decode() == DEFAULT_DB_ALIAS
+
+
+def test_replica_is_reset_after_view(make_request):
+    @db_router.read_from_replica
+    def failing_view(request):
+        raise RuntimeError('ошибка представления')
+
+    read_database(make_request())
+    with pytest.raises(RuntimeError):
+        failing_view(make_request())
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+
+
+def test_request_without_writes_is_not_pinned(make_request):
+    request = make_request('post')
+    ReplicaPinningMiddleware(lambda request: HttpResponse())(request)
+    assert not request.session.modified
+
+
+@pytest.mark.django_db
+def test_write_pins_session(make_request):
+    def view(request):
+        Location.objects.create(name='Москва')
+        return HttpResponse()
+
+    request = make_request('post')
+    ReplicaPinningMiddleware(view)(request)
+    assert db_router.PIN_SESSION_KEY in request.session
+    assert read_database(request) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.django_db
+def test_failed_request_is_not_pinned(make_request):
+    def view(request):
+        Location.objects.create(name='Москва')
+        return HttpResponse(status=400)
+
+    request = make_request('post')
+    ReplicaPinningMiddleware(view)(request)
+    assert db_router.PIN_SESSION_KEY not in request.session
@@ -0,0 +1,86 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+
+from blog import search
+from blog.models import (
+    AuthorFeedEntry,
+    Category,
+    CategoryFeedEntry,
+    Comment,
+    Location,
+    Post,
+)
+
+User = get_user_model()
+
+MODELS = (User, Location, Category, Post, Comment)
+
+
+@pytest.fixture
+def target(transactional_db, tmp_path):
+    # Вторая база с той же схемой: миграции на другие базы роутер
+    # не пускает, поэтому схема копируется из пустой тестовой базы
+    path = tmp_path / 'target.sqlite3'
+    connections['default'].ensure_connection()
+    with sqlite3.connect(path) as copy:
+        connections['default'].connection.backup(copy)
+    connections.settings['target'] = {
+        **connections.settings['default'], 'NAME': str(path),
+    }
+    yield 'target'
+    connections['target'].close()
+    del connections.settings['target']
+    del connections['target']
+
+
+def to_ms(date):
+    # JSON-выгрузка хранит время с точностью до миллисекунд
+    return date and date.replace(microsecond=date.microsecond // 1000 * 1000)
+
+
+def snapshot(using):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {search.SQLiteFTSBackend.table}')
+        [indexed] = cursor.fetchone()
+    return {
+        'indexed': indexed,
+        'rows': {
+            model._meta.label: model.objects.using(using).count()
+            for model in (*MODELS, CategoryFeedEntry, AuthorFeedEntry)
+        },
+        'posts': [
+            (pk, comments_count, to_ms(last_commented_at))
+            for pk, comments_count, last_commented_at in Post.objects.using(
+                using
+            ).order_by('pk').values_list(
+                'pk', 'comments_count', 'last_commented_at'
+            )
+        ],
+        'users': list(
+            User.objects.using(using).order_by('pk').values_list(
+                'pk', 'posts_count', 'comments_count'
+            )
+        ),
+    }
+
+
+def test_export_load_round_trip(target, make_posts, another_user, tmp_path):
+    first, second, _ = make_posts(3)
+    for post in (first, first, second):
+        Comment.objects.create(post=post, author=another_user, text='Текст')
+    path = tmp_path / 'dump.jsonl'
+    call_command('fast_export', output=str(path), stdout=StringIO())
+    call_command(
+        'fast_load', str(path), database=target, batch_size=2,
+        stdout=StringIO(),
+    )
+    expected = snapshot('default')
+    assert expected['rows']['blog.Comment'] == 3
+    assert expected['rows']['blog.CategoryFeedEntry'] == 3
+    assert expected['indexed'] == 3
+    assert snapshot(target) == expected
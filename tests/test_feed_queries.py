@@ -0,0 +1,48 @@
+import pytest
+from django.urls import reverse
+
+# Число запросов страницы ленты не зависит от числа постов на ней:
+# сессия, пользователь, COUNT пагинатора, сама страница и справочники
+# категорий и местоположений для карточек (у профиля — ещё его владелец)
+
+
+@pytest.mark.parametrize('posts_count', (1, 3, 7))
+def test_index_queries(author_client, make_posts, django_assert_num_queries,
+                       posts_count):
+    make_posts(posts_count)
+    with django_assert_num_queries(6):
+        response = author_client.get(reverse('blog:index'))
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('posts_count', (1, 3, 7))
+def test_category_queries(author_client, make_posts, category,
+                          django_assert_num_queries, posts_count):
+    make_posts(posts_count)
+    with django_assert_num_queries(6):
+        response = author_client.get(
+            reverse('blog:category_posts', args=[category.slug])
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('posts_count', (1, 3, 7))
+def test_own_profile_queries(author_client, author, make_posts,
+                             django_assert_num_queries, posts_count):
+    make_posts(posts_count)
+    with django_assert_num_queries(7):
+        response = author_client.get(
+            reverse('blog:profile', args=[author.username])
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('posts_count', (1, 3, 7))
+def test_visitor_profile_queries(another_client, author, make_posts,
+                                 django_assert_num_queries, posts_count):
+    make_posts(posts_count)
+    with django_assert_num_queries(7):
+        response = another_client.get(
+            reverse('blog:profile', args=[author.username])
+        )
+    assert response.status_code == 200
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import feeds
+from blog.models import AuthorFeedEntry, Category, CategoryFeedEntry, Post
+
+
+def category_feed(category):
+    return list(
+        CategoryFeedEntry.objects.filter(category=category).values_list(
+            'post_id', flat=True
+        )
+    )
+
+
+def author_feed(author):
+    return list(
+        AuthorFeedEntry.objects.filter(author=author).values_list(
+            'post_id', flat=True
+        )
+    )
+
+
+def feed_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if 'feedentry' in query['sql']
+    ]
+
+
+def test_published_post_enters_feeds(make_posts, category, author):
+    posts = make_posts(2)
+    expected = [post.pk for post in posts]
+    assert category_feed(category) == expected
+    assert author_feed(author) == expected
+
+
+def test_hidden_post_leaves_feeds(post, category, author):
+    post.is_published = False
+    post.save()
+    assert category_feed(category) == []
+    assert author_feed(author) == []
+
+
+def test_post_moves_with_its_category(post, category):
+    other = Category.objects.create(
+        title='Еда', description='Описание', slug='food'
+    )
+    post.category = other
+    post.save()
+    assert category_feed(category) == []
+    assert category_feed(other) == [post.pk]
+
+
+def test_category_publication_toggles_feed(post, category, author):
+    category.is_published = False
+    category.save()
+    assert category_feed(category) == []
+    assert author_feed(author) == []
+    category.is_published = True
+    category.save()
+    assert category_feed(category) == [post.pk]
+    assert author_feed(author) == [post.pk]
+
+
+def test_category_title_edit_keeps_feed_rows(post, category):
+    category.title = 'Походы'
+    with CaptureQueriesContext(connection) as context:
+        category.save()
+    assert feed_queries(context.captured_queries) == []
+    assert category_feed(category) == [post.pk]
+
+
+def test_scheduled_publication_does_not_refetch_category(make_posts,
+                                                         category):
+    [post] = make_posts(1, is_published=True)
+    Post.objects.filter(pk=post.pk).update(
+        is_live=False, pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    feeds.remove_posts([post.pk])
+    with CaptureQueriesContext(connection) as context:
+        call_command('publish_scheduled', stdout=StringIO())
+    assert category_feed(category) == [post.pk]
+    category_lookups = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "blog_category" WHERE "blog_category"."id"' in query['sql']
+    ]
+    assert category_lookups == []
+
+
+def test_rebuild_restores_feeds(make_posts, category, author):
+    posts = make_posts(3)
+    CategoryFeedEntry.objects.all().delete()
+    AuthorFeedEntry.objects.all().delete()
+    assert feeds.rebuild(batch_size=2) == 3
+    expected = [post.pk for post in posts]
+    assert category_feed(category) == expected
+    assert author_feed(author) == expected
+
+
+def test_failed_rebuild_keeps_old_feeds(make_posts, category, monkeypatch):
+    posts = make_posts(3)
+    bulk_create = QuerySet.bulk_create
+    calls = []
+
+    def failing_bulk_create(self, objs, *args, **kwargs):
+        if self.model is CategoryFeedEntry:
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError('сбой на второй пачке')
+        return bulk_create(self, objs, *args, **kwargs)
+
+    monkeypatch.setattr(QuerySet, 'bulk_create', failing_bulk_create)
+    with pytest.raises(RuntimeError):
+        feeds.rebuild(batch_size=2)
+    assert category_feed(category) == [post.pk for post in posts]
@@ -0,0 +1,58 @@
+import pytest
+
+from blog import fragments
+from blog.models import Comment, Post
+
+
+def test_card_version_changes_with_comments(post, another_user):
+    version = fragments.card_version(post)
+    Comment.objects.create(post=post, author=another_user, text='Текст')
+    assert fragments.card_version(Post.objects.get(pk=post.pk)) != version
+
+
+def test_invalidation_waits_for_commit(post,
+                                      django_capture_on_commit_callbacks):
+    backend = fragments.get_backend()
+    fragments.render_post_card(post)
+    key = fragments.card_key(fragments.get_generation(), post.pk)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        fragments.invalidate_post(post.pk)
+        assert backend.get(key) is not None
+    assert callbacks
+    assert backend.get(key) is None
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    # Свой LRU у каждого «процесса», общий кэш сайта один на всех
+    def worker(backend):
+        monkeypatch.setattr(fragments, '_backend', backend)
+        return fragments.render_post_card(
+            Post.objects.select_related('author').get()
+        )
+    return worker
+
+
+def test_category_rename_reaches_other_workers(
+    post, worker, django_capture_on_commit_callbacks
+):
+    first, second = fragments.LRUCache(), fragments.LRUCache()
+    assert 'Путешествия' in worker(first)
+    # Правку обрабатывает второй процесс
+    assert 'Путешествия' in worker(second)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.category.title = 'Походы'
+        post.category.save()
+    assert 'Походы' in worker(first)
+
+
+def test_username_change_reaches_other_workers(
+    post, worker, django_capture_on_commit_callbacks
+):
+    first, second = fragments.LRUCache(), fragments.LRUCache()
+    assert '@author' in worker(first)
+    assert '@author' in worker(second)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.author.username = 'writer'
+        post.author.save()
+    assert '@writer' in worker(first)
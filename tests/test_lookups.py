@@ -0,0 +1,24 @@
+from blog import lookups
+from blog.models import Category
+
+
+def test_bulk_created_category_visible_after_invalidate(
+    category, django_capture_on_commit_callbacks
+):
+    assert lookups.get_published_category(category.slug) == category
+    Category.objects.bulk_create([
+        Category(title='Новая', description='Описание', slug='new'),
+    ])
+    assert lookups.get_published_category('new') is None
+    with django_capture_on_commit_callbacks(execute=True):
+        lookups.invalidate_all()
+    assert lookups.get_published_category('new') is not None
+
+
+def test_table_reloaded_after_timeout(settings, category):
+    lookups.categories.load()
+    Category.objects.bulk_create([
+        Category(title='Новая', description='Описание', slug='new'),
+    ])
+    settings.LOOKUP_TABLE_TIMEOUT = 0
+    assert lookups.get_published_category('new') is not None
@@ -0,0 +1,26 @@
+import logging
+
+from django.urls import reverse
+
+from core import metrics
+
+
+def test_slow_query_log_names_the_view(client, post, settings, caplog):
+    settings.METRICS_SLOW_QUERY_MS = 0
+    settings.METRICS_SLOW_QUERY_SAMPLE_RATE = 1
+    logger = metrics.slow_query_logger.name
+    with caplog.at_level(logging.WARNING, logger=logger):
+        client.get(reverse('blog:post_detail', args=[post.pk]))
+    records = [
+        record for record in caplog.records
+        if record.name == logger
+    ]
+    assert records
+    assert {record.args[1] for record in records} == {'blog:post_detail'}
+
+
+def test_request_is_counted_under_view_name(client, post):
+    metrics.registry.reset()
+    client.get(reverse('blog:index'))
+    counters = metrics.registry.counters
+    assert counters['requests_total', 'blog:index', '200'] == 1
@@ -0,0 +1,125 @@
+import base64
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.models import Post
+from blog.paginators import CursorPaginator, InvalidCursor
+
+
+def make_cursor(payload):
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('payload', (
+    ['n', [None, None]],
+    ['n', [None, 1]],
+    ['p', ['2024-01-01 00:00:00+00:00', None]],
+    ['n', ['2024-01-01 00:00:00+00:00']],
+    ['n', ['2024-01-01 00:00:00+00:00', 1, 2]],
+    ['n', 'ab'],
+    ['x', ['2024-01-01 00:00:00+00:00', 1]],
+))
+def test_decode_rejects_malformed_cursor(db, payload):
+    paginator = CursorPaginator(Post.objects.all(), 3)
+    with pytest.raises(InvalidCursor):
+        paginator.decode_cursor(make_cursor(payload))
+
+
+@pytest.mark.parametrize('name', ('blog:index', 'blog:category_posts'))
+def test_null_cursor_falls_back_to_first_page(client, settings, make_posts,
+                                              category, name):
+    settings.POSTS_PAGINATION = 'cursor'
+    make_posts(2)
+    args = [category.slug] if name == 'blog:category_posts' else []
+    response = client.get(
+        reverse(name, args=args),
+        {'cursor': make_cursor(['n', [None, None]])},
+    )
+    assert response.status_code == 200
+    assert len(response.context['page_obj'].object_list) == 2
+
+
+@pytest.mark.parametrize('name', ('blog:post_detail', 'blog:post_comments'))
+def test_null_comment_cursor_falls_back_to_first_batch(client, post,
+                                                       another_user, name):
+    post.comments.create(author=another_user, text='Комментарий')
+    response = client.get(
+        reverse(name, args=[post.pk]),
+        {'comments': make_cursor(['n', [None, None]])},
+    )
+    assert response.status_code == 200
+    assert [comment.text for comment in response.context['comments']] == [
+        'Комментарий'
+    ]
+
+
+def walk_forward(paginator):
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+def walk_backward(paginator, page):
+    pages = [page]
+    while pages[-1].has_previous():
+        pages.append(paginator.get_page(pages[-1].previous_cursor))
+    return pages[::-1]
+
+
+def page_ids(pages):
+    return [[obj.pk for obj in page] for page in pages]
+
+
+@pytest.fixture
+def posts_with_equal_dates(make_posts):
+    # Семь постов с тремя значениями pub_date: границы страниц проходят
+    # внутри групп с одинаковой датой
+    posts = make_posts(7)
+    dates = [posts[0].pub_date, posts[3].pub_date, posts[6].pub_date]
+    for number, post in enumerate(posts):
+        Post.objects.filter(pk=post.pk).update(pub_date=dates[number // 3])
+    return Post.objects.published()
+
+
+@pytest.mark.parametrize('ordering', (
+    ('-pub_date', '-id'),
+    ('pub_date', 'id'),
+))
+def test_cursor_walks_pages_in_both_directions(posts_with_equal_dates,
+                                               ordering):
+    expected = list(
+        posts_with_equal_dates.order_by(*ordering).values_list(
+            'pk', flat=True
+        )
+    )
+    paginator = CursorPaginator(posts_with_equal_dates, 3, ordering)
+
+    forward = page_ids(walk_forward(paginator))
+    assert forward == [expected[:3], expected[3:6], expected[6:]]
+
+    last_page = walk_forward(paginator)[-1]
+    assert page_ids(walk_backward(paginator, last_page)) == forward
+
+
+def test_cursor_page_is_index_range_search(posts_with_equal_dates):
+    feed = Post.objects.published().for_feed()
+    paginator = CursorPaginator(feed, 3)
+    page = paginator.get_page()
+    values = [getattr(page[-1], name) for name in paginator.fields]
+    plan = (
+        feed.order_by(*paginator.ordering)
+        .filter(paginator.keyset_filter(values, backward=False))[:4]
+        .explain()
+    )
+    assert 'SEARCH blog_post USING INDEX post_feed_idx (pub_date<?)' in plan
+    assert 'SCAN blog_post' not in plan
+
+
+def test_explain_feeds_check_passes(posts_with_equal_dates):
+    call_command('explain_feeds', check=True, stdout=StringIO())
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+
+# Точное число запросов на страницах поста. Пост загружается одним
+# запросом вместе с автором, местоположением и категорией; у
+# авторизованных к нему добавляются сессия и пользователь
+
+AUTHOR, ANOTHER, ANONYMOUS = 'author', 'another', 'anonymous'
+
+
+@pytest.fixture
+def get_client(client, author_client, another_client):
+    clients = {
+        AUTHOR: author_client,
+        ANOTHER: another_client,
+        ANONYMOUS: client,
+    }
+    return clients.__getitem__
+
+
+# Страница поста: ETag и Last-Modified (blog.conditional), пост
+# и первая порция комментариев с авторами
+@pytest.mark.parametrize('user,queries', (
+    (AUTHOR, 5),
+    (ANOTHER, 5),
+    (ANONYMOUS, 3),
+))
+def test_detail_queries(get_client, post, django_assert_num_queries, user,
+                        queries):
+    with django_assert_num_queries(queries):
+        response = get_client(user).get(
+            reverse('blog:post_detail', args=[post.pk])
+        )
+    assert response.status_code == 200
+
+
+# Редактирование: пост загружается один раз в dispatch, автор получает
+# форму (с выбором местоположения и категории), остальные — редирект
+@pytest.mark.parametrize('user,queries,status', (
+    (AUTHOR, 5, 200),
+    (ANOTHER, 3, 302),
+    (ANONYMOUS, 1, 302),
+))
+def test_edit_queries(get_client, post, django_assert_num_queries, user,
+                      queries, status):
+    with django_assert_num_queries(queries):
+        response = get_client(user).get(
+            reverse('blog:edit_post', args=[post.pk])
+        )
+    assert response.status_code == status
+
+
+# Удаление: пост ищется вместе с проверкой автора, чужой даёт 404,
+# аноним уходит на страницу входа без запросов к базе
+@pytest.mark.parametrize('user,queries,status', (
+    (AUTHOR, 3, 200),
+    (ANOTHER, 3, 404),
+    (ANONYMOUS, 0, 302),
+))
+def test_delete_queries(get_client, post, django_assert_num_queries, user,
+                        queries, status):
+    with django_assert_num_queries(queries):
+        response = get_client(user).get(
+            reverse('blog:delete_post', args=[post.pk])
+        )
+    assert response.status_code == status
@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+
+from blog import comment_buffer, profile_cache
+from blog.models import Comment, Post
+
+
+@pytest.fixture
+def visit(client):
+    # HTML ленты автора, который видит посетитель
+    def visit(user):
+        response = client.get(reverse('blog:profile', args=[user.username]))
+        return response.context['profile_feed']
+    return visit
+
+
+def test_post_edit_resets_visitor_feed(
+    post, author, visit, django_capture_on_commit_callbacks
+):
+    assert 'Пост 0' in visit(author)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = 'Новый заголовок'
+        post.save()
+    assert 'Новый заголовок' in visit(author)
+
+
+def test_comment_resets_visitor_feed(
+    post, author, another_user, visit, django_capture_on_commit_callbacks
+):
+    assert 'Комментарии (0)' in visit(author)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(post=post, author=another_user, text='Текст')
+    assert 'Комментарии (1)' in visit(author)
+
+
+def test_buffered_comments_reset_visitor_feed(
+    post, author, another_user, visit, django_capture_on_commit_callbacks
+):
+    assert 'Комментарии (0)' in visit(author)
+    with django_capture_on_commit_callbacks(execute=True):
+        comment_buffer.write_batch([{
+            'post_id': post.pk,
+            'author_id': another_user.pk,
+            'text': 'Текст',
+            'created_at': '2026-01-01T00:00:00+00:00',
+        }])
+    assert 'Комментарии (1)' in visit(author)
+
+
+def test_username_change_resets_visitor_feed(
+    post, author, visit, django_capture_on_commit_callbacks
+):
+    assert '@author' in visit(author)
+    with django_capture_on_commit_callbacks(execute=True):
+        author.username = 'renamed'
+        author.save()
+    assert '@renamed' in visit(author)
+
+
+def test_owner_page_is_not_cached(post, author, author_client):
+    url = reverse('blog:profile', args=[author.username])
+    author_client.get(url)
+    # Обновление в обход сигналов: закэшированная страница его не показала бы
+    Post.objects.filter(pk=post.pk).update(title='Новый заголовок')
+    response = author_client.get(url)
+    assert 'profile_feed' not in response.context
+    [shown] = response.context['page_obj'].object_list
+    assert shown.title == 'Новый заголовок'
+
+
+def test_invalidate_all_waits_for_commit(
+    author, visit, django_capture_on_commit_callbacks
+):
+    visit(author)
+    generation = profile_cache.get_generation()
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        profile_cache.invalidate_all()
+        assert profile_cache.get_generation() == generation
+    assert callbacks
+    assert profile_cache.get_generation() != generation
@@ -0,0 +1,23 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+
+def test_due_post_is_published(make_posts):
+    post, = make_posts(1)
+    Post.objects.filter(pk=post.pk).update(is_live=False)
+    call_command('publish_scheduled', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).is_live
+
+
+def test_future_post_is_not_published(make_posts):
+    post, = make_posts(1)
+    Post.objects.filter(pk=post.pk).update(
+        is_live=False, pub_date=timezone.now() + timedelta(days=1)
+    )
+    call_command('publish_scheduled', stdout=StringIO())
+    assert not Post.objects.get(pk=post.pk).is_live
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog import search
+from blog.models import Post
+
+
+@pytest.fixture
+def admin_user(django_user_model):
+    return django_user_model.objects.create_superuser(
+        username='admin', password='password'
+    )
+
+
+def test_search_ranks_title_above_text(make_posts):
+    in_text, in_title = make_posts(2)
+    in_text.text = 'Рассказ про горы'
+    in_text.save()
+    in_title.title = 'Горы'
+    in_title.save()
+    assert search.search_post_ids('горы') == [in_title.pk, in_text.pk]
+
+
+def test_deleted_post_leaves_index(post):
+    post.delete()
+    assert search.search_post_ids('Текст') == []
+
+
+def test_search_page_hides_unpublished_posts(client, make_posts):
+    visible, hidden = make_posts(2)
+    hidden.is_published = False
+    hidden.save()
+    response = client.get(reverse('blog:search'), {'q': 'Текст'})
+    assert list(response.context['page_obj'].object_list) == [visible]
+
+
+def test_admin_search_is_not_capped(client, admin_user, make_posts,
+                                    settings):
+    settings.SEARCH_MAX_RESULTS = 1
+    make_posts(3)
+    client.force_login(admin_user)
+    response = client.get(
+        reverse('admin:blog_post_changelist'), {'q': 'Текст'}
+    )
+    assert response.context['cl'].result_count == 3
+
+
+def test_memory_index_sees_changes_of_other_processes(
+    make_posts, django_capture_on_commit_callbacks
+):
+    [first] = make_posts(1)
+    reader, writer = search.MemoryBackend(), search.MemoryBackend()
+    assert reader.search('Текст', None) == [first.pk]
+    post = Post.objects.get(pk=first.pk)
+    post.title = 'Горы'
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+        writer.index_posts([post])
+    assert reader.search('горы', None) == [post.pk]
+
+
+def test_failed_rebuild_keeps_index(make_posts, monkeypatch):
+    posts = make_posts(3)
+    backend = search.get_backend()
+    index_posts = backend.index_posts
+    calls = []
+
+    def failing_index_posts(posts, *args):
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError('сбой на второй пачке')
+        return index_posts(posts, *args)
+
+    monkeypatch.setattr(backend, 'index_posts', failing_index_posts)
+    with pytest.raises(RuntimeError):
+        call_command('rebuild_search_index', chunk_size=1, stdout=StringIO())
+    assert sorted(search.search_post_ids('Текст')) == sorted(
+        post.pk for post in posts
+    )
@@ -0,0 +1,104 @@
+from io import BytesIO
+
+import pytest
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from blog import fragments, images, tasks
+from blog.models import Post
+from blog.templatetags.responsive_images import responsive_image
+
+
+@pytest.fixture
+def image_post(settings, tmp_path, post):
+    settings.MEDIA_ROOT = tmp_path
+    buffer = BytesIO()
+    Image.new('RGB', (32, 32)).save(buffer, 'PNG')
+    post.image.save('photo.png', ContentFile(buffer.getvalue()), save=False)
+    post.image_ready = False
+    post.save()
+    return Post.objects.get(pk=post.pk)
+
+
+def test_processed_image_changes_card_version(image_post):
+    version = fragments.card_version(image_post)
+    tasks.process_image('post', image_post.pk, image_post.image.name)
+    processed = Post.objects.get(pk=image_post.pk)
+    assert processed.image_ready
+    assert fragments.card_version(processed) != version
+
+
+def derivatives(name):
+    names = (
+        images.derivative_name(name, width, extension)
+        for width in settings.IMAGE_DERIVATIVE_WIDTHS
+        for extension, _ in images.FORMATS
+    )
+    return [target for target in names if default_storage.exists(target)]
+
+
+def test_not_an_image_is_deleted(image_post):
+    name = image_post.image.name
+    with default_storage.open(name, 'wb') as file:
+        file.write(b'not an image')
+    tasks.process_image('post', image_post.pk, name)
+    assert not default_storage.exists(name)
+    assert not Post.objects.get(pk=image_post.pk).image
+
+
+def test_storage_error_keeps_image_for_retry(image_post, monkeypatch):
+    name = image_post.image.name
+
+    def failing_open(*args, **kwargs):
+        raise OSError('хранилище недоступно')
+
+    monkeypatch.setattr(default_storage, 'open', failing_open)
+    with pytest.raises(OSError):
+        tasks.process_image('post', image_post.pk, name)
+    monkeypatch.undo()
+    assert default_storage.exists(name)
+    assert Post.objects.get(pk=image_post.pk).image.name == name
+
+
+def test_stripped_image_keeps_saved_name(image_post, monkeypatch):
+    def strip_exif(name):
+        with default_storage.open(name) as source:
+            return default_storage.save('post_images/stripped.png', source)
+
+    monkeypatch.setattr(images, 'strip_exif', strip_exif)
+    tasks.process_image('post', image_post.pk, image_post.image.name)
+    processed = Post.objects.get(pk=image_post.pk)
+    assert processed.image.name == 'post_images/stripped.png'
+    assert derivatives(processed.image.name)
+
+
+def test_replaced_image_loses_derivatives(
+    image_post, django_capture_on_commit_callbacks
+):
+    old_name = image_post.image.name
+    tasks.process_image('post', image_post.pk, old_name)
+    assert derivatives(old_name)
+    buffer = BytesIO()
+    Image.new('RGB', (32, 32)).save(buffer, 'PNG')
+    post = Post.objects.get(pk=image_post.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image.save('other.png', ContentFile(buffer.getvalue()))
+    assert derivatives(old_name) == []
+
+
+def test_responsive_image_does_not_check_storage(image_post, monkeypatch):
+    tasks.process_image('post', image_post.pk, image_post.image.name)
+    post = Post.objects.get(pk=image_post.pk)
+
+    def exists(name):
+        raise AssertionError(f'storage.exists({name})')
+
+    monkeypatch.setattr(default_storage, 'exists', exists)
+    html = responsive_image(post.image)
+    # Оригинал 32×32 меньше всех ширин: создаётся только первая копия
+    width = settings.IMAGE_DERIVATIVE_WIDTHS[0]
+    for extension, _ in images.FORMATS:
+        target = images.derivative_name(post.image.name, width, extension)
+        assert f'srcset="{default_storage.url(target)} {width}w"' in html